@@ -16,8 +16,53 @@ from qtutils.qt.QtCore import*
 from qtutils.qt.QtGui import *
 from qtutils.qt.QtWidgets import *
 from PyQt5.QtWidgets import QComboBox, QGridLayout, QLineEdit, QSpinBox
+from dataclasses import dataclass
+from functools import partial
 import time
 
+
+def _mklabel(text, align=Qt.AlignLeft):
+    """Make an aligned label for a mirror row"""
+    label = QLabel(text)
+    label.setAlignment(align)
+    return label
+
+def _mkintedit():
+    """Make a centred textbox for a mirror position that only accepts integers"""
+    textbox = QLineEdit("0")
+    textbox.setAlignment(Qt.AlignCenter)
+    textbox.setValidator(QIntValidator(-32767, 32767, textbox))
+    return textbox
+
+def _mkbtn(text):
+    """Make a bordered button for a mirror row"""
+    button = QPushButton(text)
+    button.setStyleSheet("border :1px solid black")
+    return button
+
+
+@dataclass(slots=True)
+class MirrorRow:
+    """All of the widgets in the GUI row of a single mirror"""
+    name_label: QLabel
+    torque_checkbox: QCheckBox
+
+    # getters and setters for the positions
+    set_horizontal_label: QLabel
+    set_horizontal_textbox: QLineEdit
+    get_horizontal_label: QLabel
+    get_horizontal_textbox: QLabel
+
+    set_vertical_label: QLabel
+    set_vertical_textbox: QLineEdit
+    get_vertical_label: QLabel
+    get_vertical_textbox: QLabel
+
+    # buttons to set and read the position
+    set_button: QPushButton
+    get_button: QPushButton
+
+
 class CUAServoMirrorTab(DeviceTab):
     def initialise_GUI ( self ):
         """Initializes the GUI tab for the mirror servos
@@ -26,8 +71,12 @@ class CUAServoMirrorTab(DeviceTab):
         # pull the layout of the tab so that we can place widgets in it
         layout = self.get_tab_layout()
         
-        # Make it scrollable
+        # Make it scrollable, the mirror rows go in a widget inside the scroll area
         scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        rows_widget = QWidget()
+        self.rows_layout = QVBoxLayout(rows_widget)
+        scroll.setWidget(rows_widget)
         layout.addWidget(scroll)
 
         # Get properties from connection table.
@@ -41,113 +90,102 @@ class CUAServoMirrorTab(DeviceTab):
         self.mirror_mapping_dict = device.properties['mirror_mapping_dict']
 
 
-        # various widgets we will put in the layout
-        self.name_label_widgets = {}
-        self.torque_checkbox_widgets = {}
-
-        # getters and setters for the positions
-        self.set_horizontal_label_widgets = {}
-        self.set_horizontal_textbox_widgets = {}
-        self.get_horizontal_label_widgets = {}
-        self.get_horizontal_textbox_widgets = {}
-
-        self.set_vertical_label_widgets = {}
-        self.set_vertical_textbox_widgets = {}
-        self.get_vertical_label_widgets = {}
-        self.get_vertical_textbox_widgets = {}
-
-        # buttons to set and read the position
-        self.set_button_widgets = {}
-        self.get_button_widgets = {}
-
-        for row, mirror_name in enumerate(self.mirror_mapping_dict):
-            # for each channel, make a new row to put the label, editable textbox, and button to send the contents of the text box
-            cur_row = QGridLayout()
-            
-            # Name of the mirror
-            self.name_label_widgets[mirror_name] = QLabel()
-            self.name_label_widgets[mirror_name].setText(mirror_name)
-            self.name_label_widgets[mirror_name].setAlignment(Qt.AlignLeft)
-            #self.freq_label_widgets[channel_name].setFixedSize(150, 25)
-            cur_row.addWidget(self.name_label_widgets[mirror_name], 0, 0)
-
-            # Enable/disable torque
-            self.torque_checkbox_widgets[mirror_name] = QCheckBox("Torque")
-            self.torque_checkbox_widgets[mirror_name].setChecked(False)
-            cur_row.addWidget(self.torque_checkbox_widgets[mirror_name], 1, 0)
-
-            # labels and boxes for getting/setting horizontal position
-            self.set_horizontal_label_widgets[mirror_name] = QLabel()
-            self.set_horizontal_label_widgets[mirror_name].setText("Set H")
-            self.set_horizontal_label_widgets[mirror_name].setAlignment(Qt.AlignLeft)
-            cur_row.addWidget(self.set_horizontal_label_widgets[mirror_name], 0, 1)
-            self.set_horizontal_textbox_widgets[mirror_name] = QLineEdit("0")
-            self.set_horizontal_textbox_widgets[mirror_name].setAlignment(Qt.AlignCenter)
-            cur_row.addWidget(self.set_horizontal_textbox_widgets[mirror_name], 0, 2)
-
-            self.get_horizontal_label_widgets[mirror_name] = QLabel()
-            self.get_horizontal_label_widgets[mirror_name].setText("Cur H")
-            self.get_horizontal_label_widgets[mirror_name].setAlignment(Qt.AlignLeft)
-            cur_row.addWidget(self.get_horizontal_label_widgets[mirror_name], 1, 1)
-            self.get_horizontal_textbox_widgets[mirror_name] = QLabel()
-            self.get_horizontal_textbox_widgets[mirror_name].setText("-----")
-            self.get_horizontal_textbox_widgets[mirror_name].setAlignment(Qt.AlignCenter)
-            cur_row.addWidget(self.get_horizontal_textbox_widgets[mirror_name], 1, 2)
-
-            
-            # labels and boxes for getting/setting vertical position
-            self.set_vertical_label_widgets[mirror_name] = QLabel()
-            self.set_vertical_label_widgets[mirror_name].setText("Set V")
-            self.set_vertical_label_widgets[mirror_name].setAlignment(Qt.AlignLeft)
-            cur_row.addWidget(self.set_vertical_label_widgets[mirror_name], 0, 3)
-            self.set_vertical_textbox_widgets[mirror_name] = QLineEdit("0")
-            self.set_vertical_textbox_widgets[mirror_name].setAlignment(Qt.AlignCenter)
-            cur_row.addWidget(self.set_vertical_textbox_widgets[mirror_name], 0, 4)
-
-            self.get_vertical_label_widgets[mirror_name] = QLabel()
-            self.get_vertical_label_widgets[mirror_name].setText("Cur V")
-            self.get_vertical_label_widgets[mirror_name].setAlignment(Qt.AlignLeft)
-            cur_row.addWidget(self.get_vertical_label_widgets[mirror_name], 1, 3)
-            self.get_vertical_textbox_widgets[mirror_name] = QLabel()
-            self.get_vertical_textbox_widgets[mirror_name].setText("-----")
-            self.get_vertical_textbox_widgets[mirror_name].setAlignment(Qt.AlignCenter)
-            cur_row.addWidget(self.get_vertical_textbox_widgets[mirror_name], 1, 4)
-
-            # Buttons for setting/getting position
-            self.set_button_widgets[mirror_name] = QPushButton()
-            self.set_button_widgets[mirror_name].setText("Set")
-            self.set_button_widgets[mirror_name].setStyleSheet("border :1px solid black")
-            cur_row.addWidget(self.set_button_widgets[mirror_name], 0, 5)
-
-            self.get_button_widgets[mirror_name] = QPushButton()
-            self.get_button_widgets[mirror_name].setText("Get")
-            self.get_button_widgets[mirror_name].setStyleSheet("border :1px solid black")
-            cur_row.addWidget(self.get_button_widgets[mirror_name], 1, 5)
-
-            # add the row for the mirror
-            layout.addLayout(cur_row)
-
-        # connect the buttons to methods, pass in the name to the method
-        for mirror_name in self.set_button_widgets:
-            button = self.set_button_widgets[mirror_name]
-            # this syntax passes in the name of the mirror to the function when the button is pressed
-            # "state" is the button, we don't care about it so it isn't passed into the function
-            button.clicked.connect(lambda state, x=mirror_name: self.set_position_on_click(x))
-
-        for mirror_name in self.get_button_widgets:
-            button = self.get_button_widgets[mirror_name]
-            button.clicked.connect(lambda state, x=mirror_name: self.get_position_on_click(x))
-
-        for mirror_name in self.torque_checkbox_widgets:
-            button = self.torque_checkbox_widgets[mirror_name]
-            button.clicked.connect(lambda state, x=mirror_name: self.torque_toggle(x))
-        
-        # initialize the values when we start up
-        for name in self.mirror_mapping_dict:
-            self.get_position_on_click(name)
+        # widgets we will put in the layout, one row per mirror
+        self.rows = {}
+
+        # build each mirror row from the event loop so the tab paints before all the widgets exist
+        for mirror_name in self.mirror_mapping_dict:
+            QTimer.singleShot(0, partial(self._build_row, mirror_name))
+
+        # initialize the values when we start up, after the rows are built
+        QTimer.singleShot(100, self._get_initial_positions)
+
+        # keep the current positions up to date from the worker's background poll
+        self.statemachine_timeout_add(100, self._update_current_positions)
 
         self.supports_smart_programming(True)
 
+    def _build_row(self, mirror_name):
+        """Create the widgets for a single mirror and add them to the scrollable rows layout
+
+        Args:
+            mirror_name (str): name of the mirror the row controls
+        """
+        # for each channel, make a new row to put the label, editable textbox, and button to send the contents of the text box
+        cur_row = QGridLayout()
+        
+        # Name of the mirror
+        name_label = _mklabel(mirror_name)
+        cur_row.addWidget(name_label, 0, 0)
+
+        # Enable/disable torque
+        torque_checkbox = QCheckBox("Torque")
+        torque_checkbox.setChecked(False)
+        cur_row.addWidget(torque_checkbox, 1, 0)
+
+        # labels and boxes for getting/setting horizontal position
+        set_horizontal_label = _mklabel("Set H")
+        cur_row.addWidget(set_horizontal_label, 0, 1)
+        set_horizontal_textbox = _mkintedit()
+        cur_row.addWidget(set_horizontal_textbox, 0, 2)
+
+        get_horizontal_label = _mklabel("Cur H")
+        cur_row.addWidget(get_horizontal_label, 1, 1)
+        get_horizontal_textbox = _mklabel("-----", Qt.AlignCenter)
+        cur_row.addWidget(get_horizontal_textbox, 1, 2)
+
+        
+        # labels and boxes for getting/setting vertical position
+        set_vertical_label = _mklabel("Set V")
+        cur_row.addWidget(set_vertical_label, 0, 3)
+        set_vertical_textbox = _mkintedit()
+        cur_row.addWidget(set_vertical_textbox, 0, 4)
+
+        get_vertical_label = _mklabel("Cur V")
+        cur_row.addWidget(get_vertical_label, 1, 3)
+        get_vertical_textbox = _mklabel("-----", Qt.AlignCenter)
+        cur_row.addWidget(get_vertical_textbox, 1, 4)
+
+        # Buttons for setting/getting position
+        set_button = _mkbtn("Set")
+        cur_row.addWidget(set_button, 0, 5)
+
+        get_button = _mkbtn("Get")
+        cur_row.addWidget(get_button, 1, 5)
+
+        self.rows[mirror_name] = MirrorRow(
+            name_label=name_label,
+            torque_checkbox=torque_checkbox,
+            set_horizontal_label=set_horizontal_label,
+            set_horizontal_textbox=set_horizontal_textbox,
+            get_horizontal_label=get_horizontal_label,
+            get_horizontal_textbox=get_horizontal_textbox,
+            set_vertical_label=set_vertical_label,
+            set_vertical_textbox=set_vertical_textbox,
+            get_vertical_label=get_vertical_label,
+            get_vertical_textbox=get_vertical_textbox,
+            set_button=set_button,
+            get_button=get_button,
+        )
+
+        # add the row for the mirror
+        self.rows_layout.addLayout(cur_row)
+
+        # connect the buttons to slots, pass in the name to the slot
+        # the partial binds the name of the mirror, the slots take the "checked" state of the button as well
+        set_button.clicked.connect(partial(self._set_clicked, mirror_name))
+        get_button.clicked.connect(partial(self._get_clicked, mirror_name))
+        torque_checkbox.clicked.connect(partial(self._torque_clicked, mirror_name))
+
+    def _set_clicked(self, mirror_name, checked=False):
+        self.set_position_on_click(mirror_name)
+
+    def _get_clicked(self, mirror_name, checked=False):
+        self.get_position_on_click(mirror_name)
+
+    def _torque_clicked(self, mirror_name, checked=False):
+        self.torque_toggle(mirror_name)
+
     MODE_MANUAL = 1
     @define_state(MODE_MANUAL,True)  
     def set_position_on_click(self, mirror_name):
@@ -157,19 +195,27 @@ class CUAServoMirrorTab(DeviceTab):
             mirror_name (str): name of the mirror that's going to be changed
         """
 
-        # better to not use try/except and to check before casting
-        try:
-            # get the user-defined positions for the mirror (I think this is error checked in the worker class sdk functions
-            # for the motors, but I should double check this later)
-            # Also note that the positions are integers
-            horizontal_position = int(self.set_horizontal_textbox_widgets[mirror_name].text())
-            vertical_position = int(self.set_vertical_textbox_widgets[mirror_name].text())
-            
-            # yeet the mirror
-            yield(self.queue_work('main_worker','set_position', mirror_name, horizontal_position, vertical_position))
-
-        except:
+        # the validators on the textboxes only accept integers, but a box can still hold an
+        # unfinished entry (e.g. empty or a lone "-") so check it before casting
+        row = self.rows[mirror_name]
+        if not (row.set_horizontal_textbox.hasAcceptableInput() and row.set_vertical_textbox.hasAcceptableInput()):
             self.logger.debug("PLEASE ENTER A VALID INT")
+            return
+
+        # get the user-defined positions for the mirror. Also note that the positions are integers
+        horizontal_position = int(row.set_horizontal_textbox.text())
+        vertical_position = int(row.set_vertical_textbox.text())
+        
+        # yeet the mirror, the worker reads the position back once it gets there in the same call
+        position = yield(self.queue_work('main_worker','set_and_read_position',
+                                         mirror_name, horizontal_position, vertical_position))
+        if position is None:
+            self._show_read_failed(mirror_name)
+            return
+        horizontal_position, vertical_position = position
+        # reflect the current positions in the GUI, leaving the requested positions in the textboxes
+        row.get_horizontal_textbox.setText(str(horizontal_position))
+        row.get_vertical_textbox.setText(str(vertical_position))
 
         return
 
@@ -182,15 +228,66 @@ class CUAServoMirrorTab(DeviceTab):
         """
 
         # get the positions
-        horizontal_position, vertical_position = yield(self.queue_work('main_worker','get_position', mirror_name))
-        # reflect the positions in the GUI
-        self.get_horizontal_textbox_widgets[mirror_name].setText(str(horizontal_position))
-        self.get_vertical_textbox_widgets[mirror_name].setText(str(vertical_position))
-        self.set_horizontal_textbox_widgets[mirror_name].setText(str(horizontal_position))
-        self.set_vertical_textbox_widgets[mirror_name].setText(str(vertical_position))
+        position = yield(self.queue_work('main_worker','get_position', mirror_name))
+        if position is None:
+            self._show_read_failed(mirror_name)
+            return
+        horizontal_position, vertical_position = position
+        self._show_position(mirror_name, horizontal_position, vertical_position)
 
         return
 
+    @define_state(MODE_MANUAL, True)
+    def _get_initial_positions(self):
+        """Read the positions of every mirror with one worker call so the GUI starts with the current values
+        """
+        positions = yield(self.queue_work('main_worker','get_all_positions'))
+        if positions is None:
+            self.logger.warning("Failed to read the initial mirror positions")
+            return
+        for mirror_name, (horizontal_position, vertical_position) in positions.items():
+            self._show_position(mirror_name, horizontal_position, vertical_position)
+
+        return
+
+    @define_state(MODE_MANUAL, True, delete_stale_states=True)
+    def _update_current_positions(self):
+        """Show the positions from the worker's latest background poll in the current position labels
+        """
+        positions = yield(self.queue_work('main_worker','get_polled_positions'))
+        for mirror_name, (horizontal_position, vertical_position) in positions.items():
+            row = self.rows.get(mirror_name)
+            if row is not None:
+                row.get_horizontal_textbox.setText(str(horizontal_position))
+                row.get_vertical_textbox.setText(str(vertical_position))
+
+        return
+
+    def _show_position(self, mirror_name, horizontal_position, vertical_position):
+        """Reflect the positions of a mirror in the GUI
+
+        Args:
+            mirror_name (str): name of the mirror that was read
+            horizontal_position (int): current horizontal position of the mirror
+            vertical_position (int): current vertical position of the mirror
+        """
+        row = self.rows[mirror_name]
+        row.get_horizontal_textbox.setText(str(horizontal_position))
+        row.get_vertical_textbox.setText(str(vertical_position))
+        row.set_horizontal_textbox.setText(str(horizontal_position))
+        row.set_vertical_textbox.setText(str(vertical_position))
+
+    def _show_read_failed(self, mirror_name):
+        """Report a failed read so the previous positions aren't taken for a fresh read
+
+        Args:
+            mirror_name (str): name of the mirror that could not be read
+        """
+        self.logger.warning("Failed to read the position of %s", mirror_name)
+        row = self.rows[mirror_name]
+        row.get_horizontal_textbox.setText("-----")
+        row.get_vertical_textbox.setText("-----")
+
     @define_state(MODE_MANUAL, True)
     def torque_toggle(self, mirror_name):
         """Enable/disable the mirrors motors. This allows us to turn the knobs by hand
@@ -199,7 +296,7 @@ class CUAServoMirrorTab(DeviceTab):
             mirror_name (str): name of the mirror that's going to be changed
         """
 
-        result = yield(self.queue_work('main_worker','toggle_torque', mirror_name, self.torque_checkbox_widgets[mirror_name].isChecked()))
+        result = yield(self.queue_work('main_worker','toggle_torque', mirror_name, self.rows[mirror_name].torque_checkbox.isChecked()))
 
         return
 
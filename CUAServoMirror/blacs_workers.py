@@ -10,6 +10,9 @@
 #####################################################################
 
 from collections import defaultdict
+import logging
+import struct
+import threading
 import time
 
 import labscript_utils.h5_lock  # Must be imported before importing h5py.
@@ -19,26 +22,29 @@ from labscript.labscript import set_passed_properties
 from blacs.tab_base_classes import Worker
 
 from .scservo_sdk import *                    # Uses SCServo SDK library
-
-def encoder(x):
-    '''goes from -32767 to 32767 to 0 to 65534'''
-    #clip the value to the range
-    x = np.clip(x, -32000, 32000)
-
-    if x >= 0 and x <= 32767:
-        return x
-    elif x < 0 and x >= -32767:
-        return (-x + 32767)
-
-def decoder(x):
-    '''goes from 0 to 65534 to -32767 to 32767'''
-    #clip the value to the range
-    x = np.clip(x, 0, 65534)
-    
-    if x >= 0 and x <= 32767:
-        return x
-    elif x > 32767 and x <= 65534:
-        return (-x + 32767)
+from .encoding import encoder, decoder, encoder_vec, decoder_vec
+
+
+# Control table addresses
+ADDR_SCS_TORQUE_ENABLE = 40
+ADDR_SCS_GOAL_ACC = 41
+ADDR_SCS_GOAL_POSITION = 42
+ADDR_SCS_GOAL_SPEED = 46
+ADDR_SCS_PRESENT_POSITION = 56
+SCS_MOVING_STATUS_THRESHOLD = 20
+
+# Sync write packet layout: header0, header1, id, length, instruction, start address, data length per servo
+SYNC_WRITE_HEADER = struct.Struct('<7B')
+# Sync write parameters for a single servo: id, goal position (little endian since protocol_end=0)
+GOAL_POSITION_PARAM = struct.Struct('<BH')
+
+# Seconds between the background reads of every mirror position
+POSITION_POLL_INTERVAL = 0.1
+# Seconds between reads, and the most seconds to wait, while a mirror moves to a new position
+MOVE_POLL_INTERVAL = 0.02
+MOVE_TIMEOUT = 2.0
+# Consecutive reads with both servos at zero speed after which a move is taken to have stopped
+MOVE_STOPPED_READS = 2
 
 class CUAServoMirrorWorker(Worker):
 
@@ -52,17 +58,11 @@ class CUAServoMirrorWorker(Worker):
         # Set the port path
         # Get methods and members of PortHandlerLinux or PortHandlerWindows
 
-        # List of register values for the controller
-        self.register_dict = {
-            'ADDR_SCS_TORQUE_ENABLE'     : 40,
-            'ADDR_SCS_GOAL_ACC'          : 41,
-            'ADDR_SCS_GOAL_POSITION'     : 42,
-            'ADDR_SCS_GOAL_SPEED'        : 46,
-            'ADDR_SCS_PRESENT_POSITION'  : 56,
-            'SCS_MOVING_STATUS_THRESHOLD': 20,
-            }
-        self.last_position_horizontal = None
-        self.last_position_vertical = None
+        # (horizontal_id, vertical_id) for each mirror, unpacked once per call in the hot methods
+        self.mirror_ids = {mirror_name: (ids[0], ids[1]) for mirror_name, ids in self.mirror_mapping_dict.items()}
+
+        # last (horizontal, vertical) encoded positions written to each mirror, used for smart programming
+        self.last_positions = {mirror_name: (None, None) for mirror_name in self.mirror_mapping_dict}
         self.port_handler = PortHandler(self.com_port)
 
         # Initialize PacketHandler instance
@@ -71,51 +71,67 @@ class CUAServoMirrorWorker(Worker):
         self.packet_handler = PacketHandler(protocol_end)
 
         # used when need to synchronously move both mirrors and read
-        # # Initialize GroupSyncWrite instance
-        # self.group_sync_write = GroupSyncWrite(self.port_handler, self.packet_handler, ADDR_STS_GOAL_POSITION, 2)
+        # Packed goal position parameters waiting to be sent in one sync write packet
+        self.goal_position_params = bytearray()
+
+        # Initialize GroupSyncRead instace for Present Position
+        self.group_sync_read = GroupSyncRead(self.port_handler, self.packet_handler, ADDR_SCS_PRESENT_POSITION, 4)
 
-        # # Initialize GroupSyncRead instace for Present Position
-        # self.group_sync_read = GroupSyncRead(self.port_handler, self.packet_handler, ADDR_STS_PRESENT_POSITION, 4)
+        # bound methods used on every read/write, looked up once here instead of on each call
+        self.write_1_byte = self.packet_handler.write1ByteTxRx
+        self.sync_read = self.group_sync_read.txRxPacket
+        self.sync_read_data = self.group_sync_read.getData
 
         # Open port
         if self.port_handler.openPort():
-            print("Succeeded in opening the port")
+            self.logger.info("Succeeded in opening the port")
         else:
-            print("Failed to open the port")
+            self.logger.error("Failed to open the port")
             raise(RuntimeError("Failed to connect {}".format(self.name)))
 
 
         # Set port baudrate
         if self.port_handler.setBaudRate(self.baud_rate):
-            print("Succeeded in changing the baudrate")
+            self.logger.info("Succeeded in changing the baudrate")
         else:
-            print("Failed in changing the baudrate")
+            self.logger.error("Failed in changing the baudrate")
             raise(RuntimeError("Failed to initialize baud rate {}".format(self.name)))
 
-        # Set the speeds
-        for mirror_name in self.mirror_mapping_dict:
-            horizontal_id = self.mirror_mapping_dict[mirror_name][0]
-            vertical_id = self.mirror_mapping_dict[mirror_name][1]
-            # Write SCServo speed for h mirror. "0" is the speed written, not sure what kind of units or whatever it is
-            scs_comm_result, scs_error = self.packet_handler.write2ByteTxRx(self.port_handler, horizontal_id, 
-                                                                      self.register_dict['ADDR_SCS_GOAL_SPEED'], 
-                                                                      0)
-            self.check_error(scs_comm_result, scs_error)
+        # Set the speeds. Every mirror gets the same speed so a single broadcast write programs all
+        # of the servos on the bus at once, broadcast writes get no status packet back.
+        # "0" is the speed written, not sure what kind of units or whatever it is
+        scs_comm_result, scs_error = self.packet_handler.write2ByteTxRx(self.port_handler, BROADCAST_ID, 
+                                                                  ADDR_SCS_GOAL_SPEED, 
+                                                                  0)
+        self.check_error(scs_comm_result, scs_error)
 
-            # Write SCServo speed for v mirror
-            scs_comm_result, scs_error = self.packet_handler.write2ByteTxRx(self.port_handler, vertical_id, 
-                                                                      self.register_dict['ADDR_SCS_GOAL_SPEED'], 
-                                                                      0)
-            self.check_error(scs_comm_result, scs_error)
+        # Add every servo to the sync read parameter storage so one packet polls all of them
+        for servo_ids in self.mirror_ids.values():
+            for scs_id in servo_ids:
+                if not self.group_sync_read.addParam(scs_id):
+                    self.logger.error("[ID:%03d] groupSyncRead addparam failed", scs_id)
+
+        # Poll the positions of every mirror in the background so the GUI can pick them up
+        # without waiting on the serial port. The lock keeps the poller and the worker
+        # methods from talking over each other on the bus. The poll is paused while a shot
+        # is running so it stays off the bus between transition_to_buffered and transition_to_manual.
+        self.port_lock = threading.RLock()
+        self.polled_positions = {}
+        self.polling = True
+        self.poll_paused = threading.Event()
+        # set while the poll keeps failing, so a dead bus is logged once instead of every poll
+        self.poll_failing = False
+        self.poll_thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self.poll_thread.start()
 
     def check_error(self, scs_comm_result, scs_error):
         """Check the results of sending bytes to the controller
 
         """
         if scs_comm_result != COMM_SUCCESS:
-            print("%s" % self.packet_handler.getTxRxResult(scs_comm_result))
+            self.logger.error("%s", self.packet_handler.getTxRxResult(scs_comm_result))
         elif scs_error != 0:
-            print("%s" % self.packet_handler.getRxPacketError(scs_error))
+            self.logger.error("%s", self.packet_handler.getRxPacketError(scs_error))
 
 
     def set_position(self, mirror_name, horizontal_position, vertical_position, fresh=True):
@@ -127,42 +143,88 @@ class CUAServoMirrorWorker(Worker):
             vertical_position ([int]): integral final value for the vertical mirror position
         """
         
-        #clip the values to the limits
-        max_value = 65000
-        min_value = -max_value
         horizontal_position = encoder(horizontal_position)
         vertical_position = encoder(vertical_position)
 
-        # checked to see if we should reupload
-        if fresh or self.last_position_horizontal != horizontal_position or self.last_position_vertical != vertical_position:
-
-            horizontal_id = self.mirror_mapping_dict[mirror_name][0]
-            vertical_id = self.mirror_mapping_dict[mirror_name][1]
-            print("Setting mirror position for {} to ({},{})".format(mirror_name, horizontal_position, vertical_position))
-
-            # Write SCServo goal position for horizontal mirror
-            scs_comm_result, scs_error = self.packet_handler.write2ByteTxRx(self.port_handler, horizontal_id, 
-                                                                            self.register_dict['ADDR_SCS_GOAL_POSITION'], 
-                                                                            horizontal_position)
-            self.check_error(scs_comm_result, scs_error)
-
-            # Write SCServo goal position
-            scs_comm_result, scs_error = self.packet_handler.write2ByteTxRx(self.port_handler, vertical_id, 
-                                                                            self.register_dict['ADDR_SCS_GOAL_POSITION'], 
-                                                                            vertical_position)
-            self.check_error(scs_comm_result, scs_error)
+        return self._write_position(mirror_name, horizontal_position, vertical_position, fresh)
 
-            self.last_position_horizontal = horizontal_position
-            self.last_position_vertical = vertical_position
+    def _write_position(self, mirror_name, horizontal_position, vertical_position, fresh=True):
+        """Write already encoded positions for both the horizontal and the vertical mirror
 
+        Args:
+            mirror_name ([str]): name of the mirror to be moved
+            horizontal_position ([int]): encoded final value for the horizontal mirror position
+            vertical_position ([int]): encoded final value for the vertical mirror position
+        """
+        if self._queue_position(mirror_name, horizontal_position, vertical_position, fresh):
+            self._send_positions()
             return_message = (horizontal_position, vertical_position)
 
         else:
-            print(f"Used smart programming; didn't move.")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Used smart programming; didn't move.")
             return_message = None
 
         return return_message
 
+    def _queue_position(self, mirror_name, horizontal_position, vertical_position, fresh=True):
+        """Add the encoded positions for a mirror to the sync write packet, the packet
+        is only sent to the controller by _send_positions
+
+        Args:
+            mirror_name ([str]): name of the mirror to be moved
+            horizontal_position ([int]): encoded final value for the horizontal mirror position
+            vertical_position ([int]): encoded final value for the vertical mirror position
+
+        Returns:
+            bool: True if the positions were queued, False if smart programming skipped them
+        """
+        # checked to see if we should reupload
+        last_horizontal_position, last_vertical_position = self.last_positions[mirror_name]
+        if not (fresh or last_horizontal_position != horizontal_position or last_vertical_position != vertical_position):
+            return False
+
+        horizontal_id, vertical_id = self.mirror_ids[mirror_name]
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Setting mirror position for %s to (%d,%d)", mirror_name, horizontal_position, vertical_position)
+
+        # Add SCServo goal positions for both mirrors to the sync write parameter storage
+        self.goal_position_params += GOAL_POSITION_PARAM.pack(horizontal_id, horizontal_position)
+        self.goal_position_params += GOAL_POSITION_PARAM.pack(vertical_id, vertical_position)
+
+        self.last_positions[mirror_name] = (horizontal_position, vertical_position)
+
+        return True
+
+    def _send_positions(self):
+        """Write every queued goal position to the servos in a single sync write packet
+
+        The packet is packed here and written straight to the port rather than going through
+        GroupSyncWrite, which rebuilds it as a Python list with a per-byte checksum loop.
+        """
+        params = self.goal_position_params
+        packet = bytearray(SYNC_WRITE_HEADER.pack(0xFF, 0xFF, BROADCAST_ID, len(params) + 4, INST_SYNC_WRITE,
+                                                  ADDR_SCS_GOAL_POSITION, 2))
+        packet += params
+        # checksum over everything except the header
+        packet.append(~sum(packet[2:]) & 0xFF)
+
+        # Clear syncwrite parameter storage
+        self.goal_position_params = bytearray()
+
+        with self.port_lock:
+            if len(packet) > TXPACKET_MAX_LEN:
+                scs_comm_result = COMM_TX_ERROR
+            elif self.port_handler.is_using:
+                scs_comm_result = COMM_PORT_BUSY
+            else:
+                self.port_handler.clearPort()
+                if self.port_handler.writePort(packet) == len(packet):
+                    scs_comm_result = COMM_SUCCESS
+                else:
+                    scs_comm_result = COMM_TX_FAIL
+        self.check_error(scs_comm_result, 0)
+
 
 
     def get_position(self, mirror_name):
@@ -171,24 +233,147 @@ class CUAServoMirrorWorker(Worker):
         Args:
             mirror_name ([str]): name of the mirror to be moved
 
+        Returns:
+            tuple: the (horizontal_position, vertical_position) of the mirror, or None if the read failed
         """
-        horizontal_id = self.mirror_mapping_dict[mirror_name][0]
-        vertical_id = self.mirror_mapping_dict[mirror_name][1]
-        # Read SCServo present position. The speed and the position are in the same response
-        scs_present_position_speed, scs_comm_result, scs_error = self.packet_handler.read4ByteTxRx(self.port_handler, 
-                                                                                                    horizontal_id, 
-                                                                                                    self.register_dict['ADDR_SCS_PRESENT_POSITION'])
-        self.check_error(scs_comm_result, scs_error)
+        # Read SCServo present positions of every servo in one sync read
+        with self.port_lock:
+            scs_comm_result = self.sync_read()
+            self.check_error(scs_comm_result, 0)
+            if scs_comm_result != COMM_SUCCESS:
+                return None
+
+            return self._read_synced_position(mirror_name)
+
+    def set_and_read_position(self, mirror_name, horizontal_position, vertical_position):
+        """Set the position for both the horizontal and the vertical mirror, then read it back
+        once the servos have reached it so the GUI only needs a single round trip to the worker
+
+        Args:
+            mirror_name ([str]): name of the mirror to be moved
+            horizontal_position ([int]): integer final value for the horizontal mirror position
+            vertical_position ([int]): integral final value for the vertical mirror position
+
+        Returns:
+            tuple: the (horizontal_position, vertical_position) read back from the mirror, or None if the read failed
+        """
+        self.set_position(mirror_name, horizontal_position, vertical_position)
+
+        # the goal the servos were sent, after clipping
+        horizontal_goal = decoder(encoder(horizontal_position))
+        vertical_goal = decoder(encoder(vertical_position))
+
+        # the servos take a while to get there, keep reading until they are within the threshold
+        # or have stopped short of it, e.g. with the torque off or the mirror blocked
+        deadline = time.monotonic() + MOVE_TIMEOUT
+        stopped_reads = 0
+        while True:
+            with self.port_lock:
+                scs_comm_result = self.sync_read()
+                self.check_error(scs_comm_result, 0)
+                if scs_comm_result != COMM_SUCCESS:
+                    return None
+                horizontal_position, vertical_position = self._read_synced_position(mirror_name)
+                moving = self._read_synced_moving(mirror_name)
+
+            if (abs(horizontal_position - horizontal_goal) <= SCS_MOVING_STATUS_THRESHOLD
+                    and abs(vertical_position - vertical_goal) <= SCS_MOVING_STATUS_THRESHOLD):
+                break
+            # a single read at zero speed can come before the servo starts, so wait for a few
+            stopped_reads = 0 if moving else stopped_reads + 1
+            if stopped_reads >= MOVE_STOPPED_READS:
+                self.logger.info("%s stopped at (%d,%d) short of (%d,%d)", mirror_name,
+                                 horizontal_position, vertical_position, horizontal_goal, vertical_goal)
+                break
+            if time.monotonic() > deadline:
+                self.logger.warning("%s did not reach (%d,%d) within %.1f s", mirror_name,
+                               horizontal_goal, vertical_goal, MOVE_TIMEOUT)
+                break
+            time.sleep(MOVE_POLL_INTERVAL)
+
+        return horizontal_position, vertical_position
+
+    def get_all_positions(self):
+        """Get the positions of every mirror with a single sync read
+
+        Returns:
+            dict: In the format of {name_of_mirror:(horizontal_position, vertical_position)},
+                  or None if the read failed
+        """
+        scs_comm_result, positions = self._read_all_positions()
+        self.check_error(scs_comm_result, 0)
+
+        return positions
+
+    def _read_all_positions(self):
+        """Read the positions of every mirror with a single sync read, without logging failures
+
+        Returns:
+            tuple: the result of the sync read and the positions in the format of
+                   {name_of_mirror:(horizontal_position, vertical_position)}, None if the read failed
+        """
+        with self.port_lock:
+            scs_comm_result = self.sync_read()
+            if scs_comm_result != COMM_SUCCESS:
+                return scs_comm_result, None
+
+            return scs_comm_result, {mirror_name: self._read_synced_position(mirror_name)
+                                     for mirror_name in self.mirror_ids}
+
+    def get_polled_positions(self):
+        """Get the positions of every mirror from the latest background poll, this does not
+        touch the serial port
+
+        Returns:
+            dict: In the format of {name_of_mirror:(horizontal_position, vertical_position)}
+        """
+        return self.polled_positions
+
+    def _poll_loop(self):
+        """Read every mirror position until shutdown, keeping the latest result in polled_positions.
+        Nothing is read while poll_paused is set. A failed read keeps the last positions, so a bad
+        packet never shows up as every mirror sitting at (0, 0), and is only logged when the poll
+        starts failing
+        """
+        while self.polling:
+            if self.poll_paused.is_set():
+                time.sleep(POSITION_POLL_INTERVAL)
+                continue
+            try:
+                scs_comm_result, positions = self._read_all_positions()
+            except Exception:
+                if not self.poll_failing:
+                    self.logger.exception("Failed to poll the mirror positions")
+                self.poll_failing = True
+            else:
+                if positions is not None:
+                    self.polled_positions = positions
+                    if self.poll_failing:
+                        self.logger.info("Polling the mirror positions again")
+                    self.poll_failing = False
+                elif not self.poll_failing:
+                    self.check_error(scs_comm_result, 0)
+                    self.logger.warning("Failed to poll the mirror positions, keeping the last ones until a read succeeds")
+                    self.poll_failing = True
+            time.sleep(POSITION_POLL_INTERVAL)
+
+    def _read_synced_position(self, mirror_name):
+        """Extract the decoded positions of a mirror from the last sync read
+
+        Args:
+            mirror_name ([str]): name of the mirror to be read
+        """
+        horizontal_id, vertical_id = self.mirror_ids[mirror_name]
+
+        # The speed and the position are in the same response
+        scs_present_position_speed = self.sync_read_data(horizontal_id, ADDR_SCS_PRESENT_POSITION, 4)
 
         # extract the horizontal position and the speed. (We don't care about the speed as of writing this)
         horizontal_position = SCS_LOWORD(scs_present_position_speed)
         horizontal_present_speed = SCS_HIWORD(scs_present_position_speed)
 
         # do the same for the vertical
-        scs_present_position_speed, scs_comm_result, scs_error = self.packet_handler.read4ByteTxRx(self.port_handler, 
-                                                                                                    vertical_id, 
-                                                                                                    self.register_dict['ADDR_SCS_PRESENT_POSITION'])
-        self.check_error(scs_comm_result, scs_error)
+        scs_present_position_speed = self.sync_read_data(vertical_id, ADDR_SCS_PRESENT_POSITION, 4)
 
         vertical_position = SCS_LOWORD(scs_present_position_speed)
         vertical_present_speed = SCS_HIWORD(scs_present_position_speed)
@@ -198,6 +383,23 @@ class CUAServoMirrorWorker(Worker):
 
         return horizontal_position, vertical_position
 
+    def _read_synced_moving(self, mirror_name):
+        """Check the present speeds of a mirror from the last sync read
+
+        Args:
+            mirror_name ([str]): name of the mirror to be read
+
+        Returns:
+            bool: True if either servo of the mirror is moving
+        """
+        horizontal_id, vertical_id = self.mirror_ids[mirror_name]
+
+        # the speed is the high word of the response, bit 15 only holds the direction
+        horizontal_present_speed = SCS_HIWORD(self.sync_read_data(horizontal_id, ADDR_SCS_PRESENT_POSITION, 4))
+        vertical_present_speed = SCS_HIWORD(self.sync_read_data(vertical_id, ADDR_SCS_PRESENT_POSITION, 4))
+
+        return bool((horizontal_present_speed | vertical_present_speed) & 0x7FFF)
+
     def toggle_torque(self, mirror_name, is_checked):
         """Enable or disable the ability to move the mirror by hand/move the motor
 
@@ -206,27 +408,29 @@ class CUAServoMirrorWorker(Worker):
             is_checked (bool): If true, torque is enabled and the mirror can not be moved by hand
                                If false, it can be moved by hand
         """     
-        horizontal_id = self.mirror_mapping_dict[mirror_name][0]
-        vertical_id = self.mirror_mapping_dict[mirror_name][1]
+        horizontal_id, vertical_id = self.mirror_ids[mirror_name]
 
         if is_checked:
             torque_val = 1
         else:  
             torque_val = 0
 
-        scs_comm_result, scs_error = self.packet_handler.write1ByteTxRx(self.port_handler, horizontal_id, 
-                                                                        self.register_dict['ADDR_SCS_TORQUE_ENABLE'], torque_val)
+        with self.port_lock:
+            scs_comm_result, scs_error = self.write_1_byte(self.port_handler, horizontal_id, 
+                                                           ADDR_SCS_TORQUE_ENABLE, torque_val)
 
-        self.check_error(scs_comm_result, scs_error)
+            self.check_error(scs_comm_result, scs_error)
 
-        scs_comm_result, scs_error = self.packet_handler.write1ByteTxRx(self.port_handler, vertical_id, 
-                                                                        self.register_dict['ADDR_SCS_TORQUE_ENABLE'], torque_val)
+            scs_comm_result, scs_error = self.write_1_byte(self.port_handler, vertical_id, 
+                                                           ADDR_SCS_TORQUE_ENABLE, torque_val)
 
-        self.check_error(scs_comm_result, scs_error)
+            self.check_error(scs_comm_result, scs_error)
 
     def shutdown (self):
         # Once off device shutdown code called when the
         # BLACS exits
+        self.polling = False
+        self.poll_thread.join()
         self.port_handler.closePort()
 
     def program_manual ( self , front_panel_values ):
@@ -260,14 +464,39 @@ class CUAServoMirrorWorker(Worker):
         self.h5_filepath = h5_file_path
         self.device_name = device_name
 
+        # keep the background poll off the bus until the shot is over
+        self.poll_paused.set()
+
         # From the H5 sequence file, get the sequence we want programmed into the arduino
         with h5py.File(h5_file_path, 'r') as hdf5_file:
             
             devices = hdf5_file['devices'][device_name]
-            # Iterate over the set positions for the mirrors, add fresh
-            for mirror_name in devices.keys():
-                positions = devices[mirror_name]
-                self.set_position(mirror_name, horizontal_position=positions[0], vertical_position=positions[1], fresh=fresh)
+            if 'positions' in devices:
+                # all of the mirror positions are stored in one structured dataset, read it in one go
+                positions = devices['positions'][:]
+                mirror_names = [mirror_name.decode() for mirror_name in positions['name']]
+                horizontal_positions = positions['h']
+                vertical_positions = positions['v']
+            else:
+                # shot files compiled before the structured dataset have one (h, v) dataset per mirror
+                mirror_names = list(devices.keys())
+                if not mirror_names:
+                    self.logger.info("No mirror positions in %s for %s, nothing to program", h5_file_path, device_name)
+                    return {}
+                self.logger.warning("No 'positions' dataset for %s, reading the per mirror datasets", device_name)
+                positions = np.array([devices[mirror_name][:] for mirror_name in mirror_names], dtype=np.int32)
+                horizontal_positions = positions[:, 0]
+                vertical_positions = positions[:, 1]
+
+        # encode all of the positions at once, then iterate over the mirrors, add fresh
+        encoded_positions = zip(encoder_vec(horizontal_positions), encoder_vec(vertical_positions))
+        queued = False
+        for mirror_name, (horizontal_position, vertical_position) in zip(mirror_names, encoded_positions):
+            queued |= self._queue_position(mirror_name, int(horizontal_position), int(vertical_position), fresh=fresh)
+
+        # move every mirror for the shot with one packet
+        if queued:
+            self._send_positions()
 
         final_values = {}
         return final_values
@@ -277,16 +506,19 @@ class CUAServoMirrorWorker(Worker):
         # Called when the shot has finished , the device should
         # be placed back into manual mode
         # return True on success
+        self.poll_paused.clear()
         return True
 
     def abort_transition_to_buffered ( self ):
         # Called only if transition_to_buffered succeeded and the
         # shot if aborted prior to the initial trigger
         # return True on success
+        self.poll_paused.clear()
         return True
     def abort_buffered ( self ):
         # Called if the shot is to be abort in the middle of
         # the execution of the shot ( after the initial trigger )
         # return True on success
+        self.poll_paused.clear()
         return True
 
@@ -0,0 +1,50 @@
+#####################################################################
+#                                                                   #
+# Copyright 2019, Monash University and contributors                #
+#                                                                   #
+# This file is part of labscript_devices, in the labscript suite    #
+# (see http://labscriptsuite.org), and is licensed under the        #
+# Simplified BSD License. See the license.txt file in the root of   #
+# the project for the full license.                                 #
+#                                                                   #
+#####################################################################
+
+"""Conversion between signed mirror positions and the servo's unsigned 16 bit position register.
+Kept free of the labscript and BLACS imports so it can be used and tested on its own.
+"""
+
+import numpy as np
+
+def _encode_bits(x):
+    '''negative values are stored as bit 15 (the sign) with the remaining bits holding ~x'''
+    sign = x >> 15
+    return (x ^ sign) | (sign & 0x8000)
+
+def _decode_bits(x):
+    '''inverse of _encode_bits, bit 15 selects whether the low bits are inverted back'''
+    sign = -(x >> 15)
+    return (x & 0x7FFF) ^ sign
+
+def encoder(x):
+    '''goes from -32767 to 32767 to 0 to 65534'''
+    if isinstance(x, np.ndarray):
+        return encoder_vec(x)
+
+    #clip the value to the range
+    return _encode_bits(max(-32000, min(32000, int(x))))
+
+def decoder(x):
+    '''goes from 0 to 65534 to -32767 to 32767'''
+    if isinstance(x, np.ndarray):
+        return decoder_vec(x)
+
+    #clip the value to the range
+    return _decode_bits(max(0, min(65534, int(x))))
+
+def encoder_vec(x):
+    '''array version of encoder, transforms every element of an int array in one pass'''
+    return _encode_bits(np.clip(np.asarray(x, dtype=np.int32), -32000, 32000))
+
+def decoder_vec(x):
+    '''array version of decoder, transforms every element of an int array in one pass'''
+    return _decode_bits(np.clip(np.asarray(x, dtype=np.int32), 0, 65534))
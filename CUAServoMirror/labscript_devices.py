@@ -65,10 +65,15 @@ class CUAServoMirror(IntermediateDevice):
 
         grp = hdf5_file.require_group(f'/devices/{self.name}/')
 
-        for mirror_name in self.mirror_positions_dict.keys():
-            if self.mirror_positions_dict[mirror_name][0] is not None and self.mirror_positions_dict[mirror_name][1] is not None:
-                positions = grp.require_dataset(mirror_name, (2,), dtype='i')
-                positions[:] = self.mirror_positions_dict[mirror_name]
+        # Store every mirror that has been given a position as one row of a structured dataset
+        # so that BLACS can read all of them at once
+        rows = [(mirror_name.encode(), horizontal_position, vertical_position)
+                for mirror_name, (horizontal_position, vertical_position) in self.mirror_positions_dict.items()
+                if horizontal_position is not None and vertical_position is not None]
+        if rows:
+            name_length = max(len(row[0]) for row in rows)
+            positions = np.array(rows, dtype=[('name', f'S{name_length}'), ('h', 'i4'), ('v', 'i4')])
+            grp.create_dataset('positions', data=positions)
         
 
 
@@ -1,35 +1,59 @@
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
 import numpy as np
 
-def encoder(x):
-    '''goes from -2**15 to 2**15-1 to 0 to 2**16-1'''
-    #clip the value to the range
-    x = np.clip(x, -2**15, 2**15-1)
+# the worker re-exports these from CUAServoMirror.encoding, which needs nothing but numpy
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from CUAServoMirror.encoding import encoder, decoder, encoder_vec, decoder_vec
 
-    if x >= 0 and x <= 2**15-1:
-        return x
-    elif x < 0 and x >= -2**15:
-        return (-x + 2**15+100)
 
-def decoder(x):
-    '''goes from 0 to 65534 to -32767 to 32767'''
-    #2**15 is 32768
-    #clip the value to the range
-    x = np.clip(x, 0, 2**16-1)
-    
-    if x >= 0 and x <= 2**15-1:
-        return x
-    elif x >= 2**15 and x <= 2**16-1:
-        return (-x + 2**15-1)
+def test_encoder_decoder():
+    '''sweep the whole position range through the worker's encoder and decoder'''
+    x = np.arange(-32000, 32001)
+    y = encoder_vec(x)
+    z = decoder_vec(y)
 
+    # encoded positions fit the unsigned 16 bit register, and decode back to the input
+    assert y.min() >= 0 and y.max() <= 65534
+    np.testing.assert_array_equal(z, x)
+
+    # positive positions are stored as is, negative ones as -x + 32767
+    np.testing.assert_array_equal(y, np.where(x >= 0, x, -x + 32767))
+
+
+# boundary and sample positions, the sweep above covers the rest through the vector path
+SAMPLE_POSITIONS = [-32000, -12345, -1, 0, 1, 12345, 32000]
+# out of range inputs that get clipped to the ends of the range
+CLIPPED_POSITIONS = [-40000, -32001, 32001, 40000]
+CLIPPED_CODES = [-1, 65535, 70000]
+
+
+def test_scalar_round_trip():
+    '''the scalar path that set_position and _read_synced_position use also round trips'''
+    for x in SAMPLE_POSITIONS:
+        assert decoder(encoder(x)) == x
+
+
+def test_scalar_matches_vector():
+    '''the bit twiddled scalar and array paths map every sample to the same code, clipping included'''
+    positions = SAMPLE_POSITIONS + CLIPPED_POSITIONS
+    assert [encoder(x) for x in positions] == encoder_vec(positions).tolist()
+
+    codes = encoder_vec(SAMPLE_POSITIONS).tolist() + CLIPPED_CODES
+    assert [decoder(x) for x in codes] == decoder_vec(codes).tolist()
+
+    # clipped values land on the ends of the range
+    assert [encoder(x) for x in CLIPPED_POSITIONS] == [encoder(-32000)] * 2 + [encoder(32000)] * 2
+    assert [decoder(x) for x in CLIPPED_CODES] == [decoder(0), decoder(65534), decoder(65534)]
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
 
-def test_encoder_decoder():
     x = np.arange(-2**16, 2**16-1, 1)
-    y = [ encoder(i) for i in x ]
-    z = [ decoder(i) for i in y]
+    y = encoder_vec(x)
+    z = decoder_vec(y)
     plt.plot(x, y, 'b')
     plt.plot(x, z, 'r')
     plt.show()
-
-if __name__ == '__main__':
-    test_encoder_decoder()
\ No newline at end of file
@@ -42,13 +42,12 @@ def main():
         for idx, servo_id in enumerate(SERVO_IDS):
             servo_key = f"servo{idx+1}"
             print(
-                f"Servo {idx+1} (ID:{servo_id:03d}) - Position: {positions[servo_key]['position']}, Speed: {positions[servo_key]['speed']}"
+                f"Servo {idx+1} (ID:{servo_id:03d}) - Position: {positions[servo_key].position}, Speed: {positions[servo_key].speed}"
             )
 
         # Example 2: Wait for servos to reach goal positions
         print("\n--- Example 2: Waiting for servos to reach goal ---")
-        controller.set_goal_positions(goal_positions)
-        if controller.wait_for_positions(goal_positions, threshold=20):
+        if controller.move_and_wait(goal_positions, threshold=20):
             print("All servos reached their goal positions!")
         else:
             print("Timeout waiting for servos to reach goal positions")
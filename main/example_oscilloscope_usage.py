@@ -3,7 +3,6 @@
 #
 
 from oscilloscope_reader import OscilloscopeReader
-import matplotlib.pyplot as plt
 
 
 def main():
@@ -33,7 +32,6 @@ def main():
         # Example 1: Read values (sample indices)
         print("\n--- Example 1: Reading waveform values ---")
         data = reader.read_values()
-        print(f"Data shape: {data.shape}")
         print(f"Number of samples: {len(data[0])}")
         print(f"First 5 X values: {data[0][:5]}")
         print(f"First 5 Y values: {data[1][:5]}")
@@ -48,7 +46,7 @@ def main():
         print("\n--- Example 3: Reading from channel 1 ---")
         try:
             channel_data = reader.read_values(channel=1)
-            print(f"Channel 1 data shape: {channel_data.shape}")
+            print(f"Channel 1 samples: {len(channel_data[0])}")
         except Exception as e:
             print(f"Error reading channel 1: {e}")
 
@@ -104,6 +102,8 @@ def example_plotting():
     """
     Example of reading and plotting oscilloscope data.
     """
+    import matplotlib.pyplot as plt
+
     print("\n--- Example: Plotting waveform ---")
 
     try:
@@ -1,3 +1,11 @@
+import argparse
+import logging
+import logging.handlers
+import math
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
 import numpy as np
 from oscilloscope_reader import OscilloscopeReader
 from motor_control import MotorController
@@ -11,10 +19,11 @@ SERVO_IDS = [30, 31, 80, 81]
 MIN_POSITION = 500
 MAX_POSITION = 3500
 THRESHOLD = 2  # Threshold for the motor controller
+MOTOR_POLL_INTERVAL = 0.002  # Longest delay in seconds between position polls while waiting
 
 # Oscilloscope
 OSCILLOSCOPE_CHANNEL = None
-WAIT_FOR_OSCILLOSCOPE = 0.1  # Seconds
+WAIT_FOR_OSCILLOSCOPE = 0.1  # Maximum seconds to wait for a fresh oscilloscope record
 
 # Value scaling
 VALUE_OFFSET = 8000000
@@ -24,22 +33,44 @@ VALUE_THRESHOLD = 0.032
 # Optimization
 NO_UPDATE_COUNT_THRESHOLD = 3
 REASONABLE_VALUE_THRESHOLD = 0.035
-MANUAL_SEARCH_ITERATIONS = int(input("MANUAL_SEARCH_ITERATIONS: "))
+BLACKBOX_CACHE_SIZE = 4096  # Number of evaluated positions remembered by blackbox
+BLACKBOX_CACHE_SAMPLES = 3  # Measurements averaged per position before blackbox reuses the value
+GRADIENT_NOISE_FLOOR = VALUE_THRESHOLD * 0.1  # Gradient norm (times step) below which a knob search stops
+# Defaults, overridden in main() by the command line or the URO_*_ITERS environment variables
+MANUAL_SEARCH_ITERATIONS = 1
 ONE_KNOB_SEARCH_ITERATIONS = 0
-TWO_KNOB_SEARCH_ITERATIONS = int(input("TWO_KNOB_SEARCH_ITERATIONS: "))
-FINE_MANUAL_SEARCH_ITERATIONS = int(input("FINE_MANUAL_SEARCH_ITERATIONS: "))
+TWO_KNOB_SEARCH_ITERATIONS = 1
+FINE_MANUAL_SEARCH_ITERATIONS = 1
+
+# Logging
+LOG_FILE = "optimization.log"
+LOG_BUFFER_CAPACITY = 1024  # Records buffered in memory before they are written to LOG_FILE
 
-# Global instances (initialized in main)
-oscilloscope = None
-motor_controller = None
+logger = logging.getLogger(__name__)
 
 
-def setup_oscilloscope():
+@dataclass(slots=True)
+class Rig:
     """
-    Initialize the oscilloscope.
+    Devices of one optimization run, passed explicitly to the search functions.
     """
-    global oscilloscope
 
+    oscilloscope: OscilloscopeReader
+    motor_controller: MotorController
+    # Running mean and measurement count per evaluated position, least recently used first
+    blackbox_cache: OrderedDict = field(default_factory=OrderedDict)
+    # Last value measured or served by blackbox, the value at the positions the motors hold
+    last_value: float = -np.inf
+
+
+def setup_oscilloscope(motor_controller=None):
+    """
+    Initialize the oscilloscope.
+    Args:
+        motor_controller: Motor controller to disconnect if the oscilloscope fails to connect
+    Returns:
+        OscilloscopeReader: Connected and configured oscilloscope
+    """
     print("=" * 60)
     print("Initializing oscilloscope...")
     print("=" * 60)
@@ -58,14 +89,17 @@ def setup_oscilloscope():
         start_acquisition=True,
     )
     print("\n\nOscilloscope connected and configured")
+    return oscilloscope
 
 
-def setup_motor_controller():
+def setup_motor_controller(oscilloscope=None):
     """
     Initialize the motor controller.
+    Args:
+        oscilloscope: Oscilloscope to disconnect if the motor controller fails to connect
+    Returns:
+        MotorController: Connected and configured motor controller
     """
-    global motor_controller
-
     print("=" * 60)
     print("Initializing motor controller...")
     print("=" * 60)
@@ -82,99 +116,239 @@ def setup_motor_controller():
     # Configure servos
     motor_controller.configure_servos(acc=0, speed=0)
     print("\n\nMotor controller connected and configured")
+    return motor_controller
 
 
-def disconnect_devices():
+def disconnect_devices(rig):
     """
     Disconnect the oscilloscope and motor controller.
+    Args:
+        rig: Devices to disconnect
     """
     print("=" * 60)
     print("Disconnecting devices...")
     print("=" * 60)
-    if oscilloscope:
-        oscilloscope.disconnect()
-    if motor_controller:
-        motor_controller.disconnect()
+    if rig.oscilloscope:
+        rig.oscilloscope.disconnect()
+    if rig.motor_controller:
+        rig.motor_controller.disconnect()
     print("\n\nDisconnected from oscilloscope and motor controller")
 
 
-def set_motor_positions(positions):
+def send_motor_positions(rig, positions):
     """
-    Set and wait for motor positions.
+    Check and send goal positions without waiting for the motors to reach them.
     Args:
-        positions: List of motor positions
-        threshold: Position threshold for the motor controller
+        rig: Devices to use
+        positions: Array (or list) of motor positions
+    Returns:
+        list: Sent positions as ints, or None if they are out of range
     """
     if len(positions) != len(SERVO_IDS):
         raise ValueError(
             f"Number of positions ({len(positions)}) must match number of servos ({len(SERVO_IDS)})"
         )
 
-    # Check and clip positions
-    for i, pos in enumerate(positions):
-        if pos < MIN_POSITION or pos > MAX_POSITION:
-            return
-        positions[i] = int(np.clip(pos, MIN_POSITION, MAX_POSITION))
+    # Check positions as plain ints, cheaper than NumPy for a handful of values
+    if hasattr(positions, "tolist"):
+        positions = positions.tolist()
+    else:
+        positions = [int(pos) for pos in positions]
+    if min(positions) < MIN_POSITION or max(positions) > MAX_POSITION:
+        return None
 
-    motor_controller.set_goal_positions(positions)
-    motor_controller.wait_for_positions(positions, THRESHOLD, timeout=5.0)
+    rig.motor_controller.set_goal_positions(positions)
+    return positions
 
 
-def get_value():
+def wait_for_motor_positions(rig, positions):
     """
-    Get the scaled value of the mean of the oscilloscope values.
+    Wait for the motors to reach positions sent with send_motor_positions.
+    Args:
+        rig: Devices to use
+        positions: Positions returned by send_motor_positions (None does not wait)
+    """
+    if positions is not None:
+        rig.motor_controller.wait_for_positions(
+            positions, THRESHOLD, timeout=5.0, max_interval=MOTOR_POLL_INTERVAL
+        )
+
+
+def set_motor_positions(rig, positions):
+    """
+    Set and wait for motor positions.
+    Args:
+        rig: Devices to use
+        positions: Array (or list) of motor positions
+    """
+    wait_for_motor_positions(rig, send_motor_positions(rig, positions))
+
+
+def wait_for_oscilloscope(rig):
+    """
+    Wait until the oscilloscope record holds only new samples, at most WAIT_FOR_OSCILLOSCOPE seconds.
+    """
+    rig.oscilloscope.wait_new_record(timeout=WAIT_FOR_OSCILLOSCOPE)
+
+
+def read_value(rig):
+    """
+    Read the scaled value of the mean of the oscilloscope values without waiting.
     Returns:
         float: Value
     """
-    time.sleep(WAIT_FOR_OSCILLOSCOPE)
-    mean = np.mean(oscilloscope.read_values(channel=OSCILLOSCOPE_CHANNEL)[1])
+    mean = rig.oscilloscope.read_mean(channel=OSCILLOSCOPE_CHANNEL)
     value = (mean - VALUE_OFFSET) / VALUE_SCALING_FACTOR
 
     if value < VALUE_THRESHOLD:
         raise Exception("Beam not detected (try again after checking if the beam is blocked)")
     return value
 
-def blackbox(positions):
+
+def get_value(rig):
+    """
+    Get the scaled value of the mean of the oscilloscope values.
+    Returns:
+        float: Value
+    """
+    wait_for_oscilloscope(rig)
+    return read_value(rig)
+
+
+def settle_and_read(rig, sent_positions):
+    """
+    Wait for the motors to settle, then for a fresh oscilloscope record, then read the value.
+    The oscilloscope wait only starts once the motors are in place, so the averaged record
+    holds no samples taken while the mirrors were still moving.
+    Args:
+        rig: Devices to use
+        sent_positions: Positions returned by send_motor_positions
+
+    Returns:
+        float: Value to maximize
+    """
+    wait_for_motor_positions(rig, sent_positions)
+    return get_value(rig)
+
+
+def blackbox(rig, positions):
     """
     Black-box function that:
     1. Sets motor positions
     2. Gets the value
 
+    Values are cached per position, bucketed by THRESHOLD. Once a position has been measured
+    BLACKBOX_CACHE_SAMPLES times, the motors are still moved there but the running mean is
+    returned without reading the oscilloscope again. Out of range positions are not sent,
+    so they are neither measured nor cached.
+
     Args:
+        rig: Devices to use
         positions (list): List of motor positions (will be converted to int)
 
     Returns:
         float: Value to maximize
     """
-    set_motor_positions(positions)
-    value = get_value()
+    key = blackbox_cache_key(positions)
+    cached = rig.blackbox_cache.get(key)
+    if cached is not None and cached[1] >= BLACKBOX_CACHE_SAMPLES:
+        rig.blackbox_cache.move_to_end(key)
+        set_motor_positions(rig, positions)
+        rig.last_value = cached[0]
+        return cached[0]
+
+    return settle_and_cache(rig, positions, send_motor_positions(rig, positions))
+
+
+def settle_and_cache(rig, positions, sent_positions):
+    """
+    Measure the value at positions sent with send_motor_positions and add it to the cache.
+    If the send was rejected the motors did not move, so nothing is measured or cached and
+    the last value, taken where the motors still are, is returned.
+    Args:
+        rig: Devices to use
+        positions (list): List of motor positions that were sent
+        sent_positions: Positions returned by send_motor_positions
+
+    Returns:
+        float: Running mean of the values measured at the positions
+    """
+    if sent_positions is None:
+        return rig.last_value
+    rig.last_value = update_blackbox_cache(rig, positions, settle_and_read(rig, sent_positions))
+    return rig.last_value
 
+
+def blackbox_cache_key(positions):
+    """
+    Cache key of the positions, bucketed by the motor threshold.
+    Positions within THRESHOLD are physically indistinguishable, so they may share a key,
+    while positions THRESHOLD or more apart never do.
+    Args:
+        positions (list): List of motor positions
+    """
+    return tuple(int(pos) // THRESHOLD for pos in positions)
+
+
+def update_blackbox_cache(rig, positions, value):
+    """
+    Add a measured value to the running mean cached for the positions.
+    Args:
+        rig: Devices to use
+        positions (list): List of motor positions (will be converted to int)
+        value (float): Measured value
+
+    Returns:
+        float: Running mean of the values measured at the positions
+    """
+    key = blackbox_cache_key(positions)
+    cached = rig.blackbox_cache.get(key)
+    if cached is not None:
+        count = cached[1] + 1
+        value = cached[0] + (value - cached[0]) / count
+    else:
+        count = 1
+    rig.blackbox_cache[key] = (value, count)
+    rig.blackbox_cache.move_to_end(key)
+    if len(rig.blackbox_cache) > BLACKBOX_CACHE_SIZE:
+        rig.blackbox_cache.popitem(last=False)
     return value
 
 
-def manual_search(servo_idx, margin, step, is_fine_search=False, verbose=True):
+def manual_search(rig, servo_idx, margin, step, is_fine_search=False, verbose=True):
     """
     Manual search for the motor positions.
     Args:
+        rig: Devices to use
         servo_idx: Index of the servo to search
         margin: Margin for the search
         step: Step size for the search
-        verbose: Whether to print verbose output
+        verbose: Whether to log every search iteration
     """
-    positions = motor_controller.read_positions()
-    manual_best_pos = positions["positions"].copy()
+    base_positions = np.asarray(rig.motor_controller.read_positions_tuple(), dtype=np.int32)
+    manual_best_pos = base_positions.copy()
     manual_best_value = -np.inf
-    low_position = positions["positions"][servo_idx] - margin
-    high_position = positions["positions"][servo_idx] + margin
+    low_position = int(base_positions[servo_idx]) - margin
+    high_position = int(base_positions[servo_idx]) + margin
     no_update_count = 0
-    for i, pos in enumerate(range(low_position, high_position, step)):
-        test_positions = positions["positions"].copy()
-        test_positions[servo_idx] = pos
-        set_motor_positions(test_positions)
-        value = blackbox(test_positions)
+    sweep = np.arange(low_position, high_position, step, dtype=np.int32)
+
+    # Grid of all candidate positions, one row per sweep step
+    grid = np.repeat(base_positions[np.newaxis, :], len(sweep), axis=0)
+    grid[:, servo_idx] = sweep
+
+    # Two-stage pipeline: the goal for the next position is sent as soon as the value
+    # at the current position is read, so the motors move during the bookkeeping below
+    if len(sweep) > 0:
+        sent_positions = send_motor_positions(rig, grid[0])
+    for i, pos in enumerate(sweep.tolist()):
+        value = settle_and_cache(rig, grid[i], sent_positions)
+        if i + 1 < len(sweep):
+            sent_positions = send_motor_positions(rig, grid[i + 1])
         if verbose:
-            print(
-                f"{'fine-' if is_fine_search else ''}manual: {servo_idx} | iter: {i} | position: {pos} | value: {value} | best value: {manual_best_value}"
+            logger.debug(
+                "%smanual: %d | iter: %d | position: %d | value: %s | best value: %s",
+                "fine-" if is_fine_search else "", servo_idx, i, pos, value, manual_best_value,
             )
         if value > manual_best_value:
             manual_best_value = value
@@ -183,115 +357,132 @@ def manual_search(servo_idx, margin, step, is_fine_search=False, verbose=True):
             no_update_count += 1
         if not is_fine_search and no_update_count > NO_UPDATE_COUNT_THRESHOLD and manual_best_value > REASONABLE_VALUE_THRESHOLD:
             break
-    return blackbox(manual_best_pos)
+    return blackbox(rig, manual_best_pos)
 
 
-def one_knob_search(servo_idx, step, verbose=True):
+def one_knob_search(rig, servo_idx, step, verbose=True):
     """
     One-knob search for the motor positions.
     Args:
+        rig: Devices to use
         servo_idx: Index of the servo to search
         step: Step size for the search
-        verbose: Whether to print verbose output
+        verbose: Whether to log every search iteration
     """
 
-    def get_direction():
-        positions = motor_controller.read_positions()
-        current_position = positions["positions"].copy()
+    def get_direction(current_positions):
+        current_position = current_positions.copy()
         current_position[servo_idx] += step
-        df_dx = blackbox(current_position)
+        df_dx = blackbox(rig, current_position)
         current_position[servo_idx] -= 2 * step
-        df_dx -= blackbox(current_position)
+        df_dx -= blackbox(rig, current_position)
         df_dx /= 2 * step
-        return df_dx / np.linalg.norm(df_dx)
+        return math.copysign(1.0, df_dx), abs(df_dx)
 
-    positions = motor_controller.read_positions()
-    one_knob_best_pos = positions["positions"].copy()
+    # Read the positions once, afterwards the commanded positions are tracked locally
+    current_positions = np.asarray(rig.motor_controller.read_positions_tuple(), dtype=np.int32)
+    one_knob_best_pos = current_positions.copy()
     one_knob_best_value = -np.inf
-    direction = get_direction()
+    direction, gradient_norm = get_direction(current_positions)
     no_update_count = 0
     iter = 0
-    print(direction)
+    if verbose:
+        logger.debug("one-knob: %d | direction: %s", servo_idx, direction)
+    if gradient_norm < GRADIENT_NOISE_FLOOR / step:
+        # Already converged within the noise, further probing is wasted
+        return blackbox(rig, one_knob_best_pos)
     while no_update_count < NO_UPDATE_COUNT_THRESHOLD:
-        positions = motor_controller.read_positions()
-        test_positions = positions["positions"].copy()
+        test_positions = current_positions.copy()
         test_positions[servo_idx] += step * direction
-        value = blackbox(test_positions)
+        value = blackbox(rig, test_positions)
+        current_positions = test_positions
         if value > one_knob_best_value:
             one_knob_best_value = value
             one_knob_best_pos[servo_idx] = test_positions[servo_idx]
         else:
             no_update_count += 1
+            if no_update_count >= NO_UPDATE_COUNT_THRESHOLD - 1:
+                # Shrink the step instead of overshooting again
+                step = max(1, step // 2)
         if verbose:
-            print(
-                f"one-knob: {servo_idx} | iter: {iter} | position: {test_positions[servo_idx]} | value: {value} | best value: {one_knob_best_value}"
+            logger.debug(
+                "one-knob: %d | iter: %d | position: %d | value: %s | best value: %s",
+                servo_idx, iter, test_positions[servo_idx], value, one_knob_best_value,
             )
         iter += 1
-    return blackbox(one_knob_best_pos)
+    return blackbox(rig, one_knob_best_pos)
 
 
 def two_knob_search(
-    servo_idx1, servo_idx2, step, direction_update_interval=None, verbose=True
+    rig, servo_idx1, servo_idx2, step, direction_update_interval=None, verbose=True
 ):
     """
     Two-knob search for the motor positions.
     Args:
+        rig: Devices to use
         servo_idx1: Index of the first servo to search
         servo_idx2: Index of the second servo to search
         step: Step size for the search
-        verbose: Whether to print verbose output
+        verbose: Whether to log every search iteration
     """
 
-    def get_direction():
-        beginning_positions = motor_controller.read_positions()
-        current_position = beginning_positions["positions"].copy()
-        current_position[servo_idx1] += step
-        df_dx = blackbox(current_position)
-        current_position[servo_idx1] -= 2 * step
-        df_dx -= blackbox(current_position)
-        df_dx /= 2 * step
+    def get_direction(current_positions, current_value):
+        # Forward differences from the already evaluated center: 2 evaluations instead of 4
+        current_position = current_positions.copy()
         current_position[servo_idx1] += step
+        df_dx = (blackbox(rig, current_position) - current_value) / step
+        current_position[servo_idx1] = current_positions[servo_idx1]
         current_position[servo_idx2] += step
-        df_dy = blackbox(current_position)
-        current_position[servo_idx2] -= 2 * step
-        df_dy -= blackbox(current_position)
-        df_dy /= 2 * step
-        return np.array([df_dx, df_dy]) / np.linalg.norm(np.array([df_dx, df_dy]))
-
-    positions = motor_controller.read_positions()
-    two_knob_best_pos = positions["positions"].copy()
+        df_dy = (blackbox(rig, current_position) - current_value) / step
+        gradient_norm = math.hypot(df_dx, df_dy)
+        direction = np.array([df_dx, df_dy])
+        direction /= gradient_norm
+        return direction, gradient_norm
+
+    # Read the positions once, afterwards the commanded positions are tracked locally
+    current_positions = np.asarray(rig.motor_controller.read_positions_tuple(), dtype=np.int32)
+    current_value = blackbox(rig, current_positions)
+    two_knob_best_pos = current_positions.copy()
     two_knob_best_value = -np.inf
-    direction = get_direction()
+    direction, gradient_norm = get_direction(current_positions, current_value)
     no_update_count = 0
     iter = 0
     while no_update_count < NO_UPDATE_COUNT_THRESHOLD:
-        positions = motor_controller.read_positions()
-        test_positions = positions["positions"].copy()
+        if gradient_norm < GRADIENT_NOISE_FLOOR / step:
+            # Converged within the noise, further probing is wasted
+            break
+        test_positions = current_positions.copy()
         test_positions[servo_idx1] += step * direction[0]
         test_positions[servo_idx2] += step * direction[1]
-        set_motor_positions(test_positions)
-        value = blackbox(test_positions)
+        value = blackbox(rig, test_positions)
+        current_positions, current_value = test_positions, value
         if value > two_knob_best_value:
             two_knob_best_value = value
             two_knob_best_pos[servo_idx1] = test_positions[servo_idx1]
             two_knob_best_pos[servo_idx2] = test_positions[servo_idx2]
         else:
             no_update_count += 1
+            if no_update_count >= NO_UPDATE_COUNT_THRESHOLD - 1:
+                # Shrink the step instead of overshooting again
+                step = max(1, step // 2)
         if verbose:
-            print(
-                f"two-knob: {servo_idx1}, {servo_idx2} | iter: {iter} | position: {test_positions[servo_idx1]}, {test_positions[servo_idx2]} | value: {value} | best value: {two_knob_best_value}"
+            logger.debug(
+                "two-knob: %d, %d | iter: %d | position: %d, %d | value: %s | best value: %s",
+                servo_idx1, servo_idx2, iter, test_positions[servo_idx1], test_positions[servo_idx2],
+                value, two_knob_best_value,
             )
         iter += 1
         if direction_update_interval and iter % direction_update_interval == 0:
-            direction = get_direction()
-    return blackbox(two_knob_best_pos)
+            direction, gradient_norm = get_direction(current_positions, current_value)
+    return blackbox(rig, two_knob_best_pos)
 
 
-def optimization(verbose=True):
+def optimization(rig, verbose=True):
     """
     Optimize the motor positions.
     Args:
-        verbose: Whether to print verbose output
+        rig: Devices to use
+        verbose: Whether to log every search iteration
     """
     start_time = time.time()
 
@@ -301,10 +492,16 @@ def optimization(verbose=True):
         print("Starting manual search...")
         print("=" * 60)
 
+        margin = 500.0
         for i in range(MANUAL_SEARCH_ITERATIONS):
-            blackbox(motor_controller.read_positions()["positions"])
+            # Each iteration searches a new region, start it with fresh measurements
+            rig.blackbox_cache.clear()
+            blackbox(rig, rig.motor_controller.read_positions_tuple())
+            # Halve the margin every iteration, computed once for all servos
+            manual_margin = int(margin)
+            margin /= 2
             for servo_idx in range(len(SERVO_IDS)):
-                manual_search(servo_idx, int(500 / (2**i)), 10, verbose=verbose)
+                manual_search(rig, servo_idx, manual_margin, 10, verbose=verbose)
         print("\n\nManual search done")
 
     # One-knob search
@@ -314,7 +511,7 @@ def optimization(verbose=True):
         print("=" * 60)
         for i in range(ONE_KNOB_SEARCH_ITERATIONS):
             for servo_idx in range(len(SERVO_IDS)):
-                one_knob_search(servo_idx, 10, verbose=verbose)
+                one_knob_search(rig, servo_idx, 10, verbose=verbose)
         print("\n\nOne-knob search done")
 
     # Two-knob search
@@ -324,12 +521,13 @@ def optimization(verbose=True):
         print("=" * 60)
         two_knob_pairs = [(0, 3), (1, 2)]
         for i in range(TWO_KNOB_SEARCH_ITERATIONS):
-            current_value = blackbox(motor_controller.read_positions()["positions"])
+            current_value = blackbox(rig, rig.motor_controller.read_positions_tuple())
             max_value = current_value
             for pair in two_knob_pairs:
                 max_value = max(
                     max_value,
                     two_knob_search(
+                        rig,
                         pair[0],
                         pair[1],
                         10,
@@ -348,13 +546,13 @@ def optimization(verbose=True):
         print("Starting fine-manual search...")
         print("=" * 60)
         for i in range(FINE_MANUAL_SEARCH_ITERATIONS):
-            current_value = blackbox(motor_controller.read_positions()["positions"])
+            current_value = blackbox(rig, rig.motor_controller.read_positions_tuple())
             max_value = current_value
             for servo_idx in range(len(SERVO_IDS)):
                 max_value = max(
                     max_value,
                     manual_search(
-                        servo_idx, 40, 2, is_fine_search=True, verbose=verbose
+                        rig, servo_idx, 40, 2, is_fine_search=True, verbose=verbose
                     ),
                 )
             if max_value < current_value * 1.01:
@@ -362,22 +560,88 @@ def optimization(verbose=True):
                 break
         print("\n\nFine-manual search done")
 
-        duration = time.time() - start_time
-        return duration
+    duration = time.time() - start_time
+    return duration
 
 
-def main():
-    global oscilloscope, motor_controller
+def parse_args(argv=None):
+    """
+    Parse the search iteration counts from the command line.
+    Each count falls back to its environment variable, then to the module default.
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    """
+    parser = argparse.ArgumentParser(description="Optimize the mirror mount motor positions.")
+    parser.add_argument(
+        "--manual",
+        type=int,
+        default=int(os.environ.get("URO_MANUAL_ITERS", MANUAL_SEARCH_ITERATIONS)),
+        help="Number of manual search iterations (env: URO_MANUAL_ITERS)",
+    )
+    parser.add_argument(
+        "--one-knob",
+        type=int,
+        default=int(os.environ.get("URO_ONE_KNOB_ITERS", ONE_KNOB_SEARCH_ITERATIONS)),
+        help="Number of one-knob search iterations (env: URO_ONE_KNOB_ITERS)",
+    )
+    parser.add_argument(
+        "--two-knob",
+        type=int,
+        default=int(os.environ.get("URO_TWO_KNOB_ITERS", TWO_KNOB_SEARCH_ITERATIONS)),
+        help="Number of two-knob search iterations (env: URO_TWO_KNOB_ITERS)",
+    )
+    parser.add_argument(
+        "--fine",
+        type=int,
+        default=int(os.environ.get("URO_FINE_ITERS", FINE_MANUAL_SEARCH_ITERATIONS)),
+        help="Number of fine-manual search iterations (env: URO_FINE_ITERS)",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help=f"Log every search iteration to {LOG_FILE}",
+    )
+    return parser.parse_args(argv)
 
-    setup_oscilloscope()
-    setup_motor_controller()
 
-    duration = optimization(verbose=True)
+def setup_logging(verbose):
+    """
+    Buffer the search iteration logs in memory and write them to LOG_FILE in batches.
+    Args:
+        verbose: Whether to log the search iterations at all
+    """
+    if not verbose:
+        return
+    file_handler = logging.FileHandler(LOG_FILE, mode="w")
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(
+        logging.handlers.MemoryHandler(LOG_BUFFER_CAPACITY, target=file_handler)
+    )
+    logger.setLevel(logging.DEBUG)
 
-    print(f"\n\nDuration: {duration:.2f} seconds")
 
-    # Disconnect devices
-    disconnect_devices()
+def main():
+    global MANUAL_SEARCH_ITERATIONS, ONE_KNOB_SEARCH_ITERATIONS
+    global TWO_KNOB_SEARCH_ITERATIONS, FINE_MANUAL_SEARCH_ITERATIONS
+
+    args = parse_args()
+    MANUAL_SEARCH_ITERATIONS = args.manual
+    ONE_KNOB_SEARCH_ITERATIONS = args.one_knob
+    TWO_KNOB_SEARCH_ITERATIONS = args.two_knob
+    FINE_MANUAL_SEARCH_ITERATIONS = args.fine
+    setup_logging(args.verbose)
+
+    oscilloscope = setup_oscilloscope()
+    motor_controller = setup_motor_controller(oscilloscope)
+    rig = Rig(oscilloscope=oscilloscope, motor_controller=motor_controller)
+
+    try:
+        duration = optimization(rig, verbose=args.verbose)
+        print(f"\n\nDuration: {duration:.2f} seconds")
+    finally:
+        # Disconnect devices (turns the motor torque off) even if the optimization fails
+        disconnect_devices(rig)
 
     print("=" * 60)
     print("Done")
@@ -2,6 +2,12 @@
 # MotorController class for managing multiple SCServo motors
 #
 
+import os
+import struct
+import time
+from typing import NamedTuple
+
+import numpy as np
 from scservo_sdk import *
 
 # Control table addresses
@@ -12,6 +18,15 @@ ADDR_STS_GOAL_SPEED = 46
 ADDR_STS_PRESENT_POSITION = 56
 
 
+class ServoState(NamedTuple):
+    """
+    Present position and speed of one servo, as returned by MotorController.read_positions().
+    """
+
+    position: int
+    speed: int
+
+
 class MotorController:
     """
     A class to control multiple SCServo motors using sync read/write operations.
@@ -48,12 +63,25 @@ class MotorController:
         self.groupSyncWrite = None
         self.groupSyncRead = None
 
+        # Result of read_positions(), reused between calls
+        self.servo_keys = [f"servo{idx+1}" for idx in range(self.num_servos)]
+        self.positions_list = [0] * self.num_servos
+        self.positions_result = {key: ServoState(0, 0) for key in self.servo_keys}
+        self.positions_result["positions"] = self.positions_list
+
         self.is_connected = False
 
-    def connect(self):
+    def connect(self, low_latency=True, read_timeout=0.001):
         """
         Open the serial port and initialize communication.
 
+        Args:
+            low_latency (bool): Whether to enable low latency mode on the port (default: True)
+            read_timeout (float): Serial read timeout in seconds (default: 0.001). The SDK
+                opens the port non-blocking and spins on read() while waiting for a reply;
+                with a timeout pyserial blocks in select() on the port instead and wakes
+                as soon as the reply bytes arrive. None keeps the SDK's non-blocking reads.
+
         Returns:
             bool: True if connection successful, False otherwise
         """
@@ -69,6 +97,14 @@ class MotorController:
                 self.portHandler, self.packetHandler, ADDR_STS_GOAL_POSITION, 2
             )
 
+            # Goal position bytes of each servo, registered once and packed in place on every move
+            self.goal_position_format = struct.Struct("<H" if self.protocol_end == 0 else ">H")
+            # Present position and speed words of each servo in the sync read reply
+            self.present_format = struct.Struct("<HH" if self.protocol_end == 0 else ">HH")
+            self.goal_position_params = [bytearray(2) for _ in self.servo_ids]
+            for servo_id, param in zip(self.servo_ids, self.goal_position_params):
+                self.groupSyncWrite.addParam(servo_id, param)
+
             # Initialize GroupSyncRead for present position
             self.groupSyncRead = GroupSyncRead(
                 self.portHandler, self.packetHandler, ADDR_STS_PRESENT_POSITION, 4
@@ -87,6 +123,10 @@ class MotorController:
                 return False
             print("Succeeded to change the baudrate")
 
+            # setBaudRate reopens the port with timeout=0, so set the read timeout afterwards
+            if read_timeout is not None:
+                self.portHandler.ser.timeout = read_timeout
+
             # Add servos to sync read group
             for servo_id in self.servo_ids:
                 if not self.groupSyncRead.addParam(servo_id):
@@ -95,6 +135,10 @@ class MotorController:
                     return False
 
             self.is_connected = True
+
+            # Every sync read waits on the USB latency timer, so shorten it right away
+            if low_latency:
+                self.set_low_latency(True)
             return True
 
         except Exception as e:
@@ -106,18 +150,68 @@ class MotorController:
                     pass
             return False
 
+    def set_low_latency(self, enable=True):
+        """
+        Enable or disable low latency mode on the serial port.
+
+        On Linux this sets ASYNC_LOW_LATENCY on the port (TIOCSSERIAL), which drops
+        the FTDI latency timer from 16 ms to 1 ms and speeds up every read round trip.
+        If the driver rejects that, the usb-serial latency_timer in sysfs is written
+        instead. On Windows this is not available from Python; set the latency timer
+        of the port to 1 ms in Device Manager (Port Settings > Advanced) instead.
+
+        Args:
+            enable (bool): True to enable low latency mode, False to disable it
+
+        Returns:
+            bool: True if the mode was changed, False if not supported
+        """
+        if not self.is_connected:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        ser = self.portHandler.ser
+        if not hasattr(ser, "set_low_latency_mode"):
+            # Expected on Windows, connect() calls this every time so stay quiet
+            return False
+
+        try:
+            ser.set_low_latency_mode(enable)
+        except (IOError, OSError, ValueError) as e:
+            if self._set_latency_timer(1 if enable else 16):
+                return True
+            print(f"Failed to set low latency mode: {e}")
+            return False
+        return True
+
+    def _set_latency_timer(self, milliseconds):
+        """
+        Write the usb-serial latency timer of the port through sysfs (Linux only).
+
+        Args:
+            milliseconds (int): Latency timer in milliseconds
+
+        Returns:
+            bool: True if the latency timer was written, False otherwise
+        """
+        tty = os.path.basename(os.path.realpath(self.device_name))
+        try:
+            with open(f"/sys/bus/usb-serial/devices/{tty}/latency_timer", "w") as f:
+                f.write(str(milliseconds))
+        except OSError:
+            return False
+        return True
+
     def disconnect(self):
         """
         Close the serial port connection.
         """
         if self.portHandler and self.is_connected:
             try:
-                # Disable torque on all servos
-                for servo_id in self.servo_ids:
-                    try:
-                        self.set_torque_enable(servo_id, False)
-                    except:
-                        pass  # Ignore errors when disconnecting
+                # Disable torque on all servos with one sync write
+                try:
+                    self._sync_write(ADDR_SCS_TORQUE_ENABLE, 1, [[0]] * self.num_servos)
+                except:
+                    pass  # Ignore errors when disconnecting
 
                 # Clear sync read parameters
                 if self.groupSyncRead:
@@ -138,25 +232,7 @@ class MotorController:
             servo_id (int): Servo ID
             acc_value (int): Acceleration value
         """
-        if not self.is_connected:
-            raise RuntimeError("Not connected. Call connect() first.")
-
-        scs_comm_result, scs_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, servo_id, ADDR_STS_GOAL_ACC, acc_value
-        )
-        if scs_comm_result != COMM_SUCCESS:
-            raise RuntimeError(
-                f"[ID:{servo_id:03d}] Failed to set acceleration: {self.packetHandler.getTxRxResult(scs_comm_result)}"
-            )
-        elif scs_error != 0:
-            error_msg = self.packetHandler.getRxPacketError(scs_error)
-            if "Input voltage error" in error_msg:
-                raise RuntimeError(
-                    f"[ID:{servo_id:03d}] Hardware error - Input voltage error! "
-                    f"Check power supply voltage and current capacity. "
-                    f"Ensure the servo is receiving adequate power (typically 6-8.4V for most servos)."
-                )
-            raise RuntimeError(f"[ID:{servo_id:03d}] Servo error: {error_msg}")
+        self._write_register(servo_id, ADDR_STS_GOAL_ACC, 1, acc_value, "acceleration")
 
     def set_speed(self, servo_id, speed_value):
         """
@@ -166,25 +242,7 @@ class MotorController:
             servo_id (int): Servo ID
             speed_value (int): Speed value
         """
-        if not self.is_connected:
-            raise RuntimeError("Not connected. Call connect() first.")
-
-        scs_comm_result, scs_error = self.packetHandler.write2ByteTxRx(
-            self.portHandler, servo_id, ADDR_STS_GOAL_SPEED, speed_value
-        )
-        if scs_comm_result != COMM_SUCCESS:
-            raise RuntimeError(
-                f"[ID:{servo_id:03d}] Failed to set speed: {self.packetHandler.getTxRxResult(scs_comm_result)}"
-            )
-        elif scs_error != 0:
-            error_msg = self.packetHandler.getRxPacketError(scs_error)
-            if "Input voltage error" in error_msg:
-                raise RuntimeError(
-                    f"[ID:{servo_id:03d}] Hardware error - Input voltage error! "
-                    f"Check power supply voltage and current capacity. "
-                    f"Ensure the servo is receiving adequate power (typically 6-8.4V for most servos)."
-                )
-            raise RuntimeError(f"[ID:{servo_id:03d}] Servo error: {error_msg}")
+        self._write_register(servo_id, ADDR_STS_GOAL_SPEED, 2, speed_value, "speed")
 
     def set_torque_enable(self, servo_id, enable):
         """
@@ -194,26 +252,54 @@ class MotorController:
             servo_id (int): Servo ID
             enable (bool): True to enable torque, False to disable
         """
+        self._write_register(servo_id, ADDR_SCS_TORQUE_ENABLE, 1, 1 if enable else 0, "torque")
+
+    def _write_register(self, servo_id, address, data_length, value, name):
+        """
+        Write a 1- or 2-byte register of a single servo and check the reply.
+
+        Args:
+            servo_id (int): Servo ID
+            address (int): Control table address
+            data_length (int): Register size in bytes (1 or 2)
+            value (int): Value to write
+            name (str): Name of the setting, used in error messages
+        """
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        value = 1 if enable else 0
-        scs_comm_result, scs_error = self.packetHandler.write1ByteTxRx(
-            self.portHandler, servo_id, ADDR_SCS_TORQUE_ENABLE, value
-        )
+        if data_length == 1:
+            write = self.packetHandler.write1ByteTxRx
+        else:
+            write = self.packetHandler.write2ByteTxRx
+        scs_comm_result, scs_error = write(self.portHandler, servo_id, address, value)
+        if scs_comm_result != COMM_SUCCESS or scs_error != 0:
+            self._raise_write_error(servo_id, name, scs_comm_result, scs_error)
+
+    def _raise_write_error(self, servo_id, name, scs_comm_result, scs_error):
+        """
+        Raise the error of a failed single-servo write.
+
+        Only called on failure, so the messages are never formatted on the success path.
+
+        Args:
+            servo_id (int): Servo ID
+            name (str): Name of the written setting, used in the message
+            scs_comm_result (int): Communication result of the write
+            scs_error (int): Servo error byte of the reply
+        """
         if scs_comm_result != COMM_SUCCESS:
             raise RuntimeError(
-                f"[ID:{servo_id:03d}] Failed to set torque: {self.packetHandler.getTxRxResult(scs_comm_result)}"
+                f"[ID:{servo_id:03d}] Failed to set {name}: {self.packetHandler.getTxRxResult(scs_comm_result)}"
             )
-        elif scs_error != 0:
-            error_msg = self.packetHandler.getRxPacketError(scs_error)
-            if "Input voltage error" in error_msg:
-                raise RuntimeError(
-                    f"[ID:{servo_id:03d}] Hardware error - Input voltage error! "
-                    f"Check power supply voltage and current capacity. "
-                    f"Ensure the servo is receiving adequate power (typically 6-8.4V for most servos)."
-                )
-            raise RuntimeError(f"[ID:{servo_id:03d}] Servo error: {error_msg}")
+        error_msg = self.packetHandler.getRxPacketError(scs_error)
+        if "Input voltage error" in error_msg:
+            raise RuntimeError(
+                f"[ID:{servo_id:03d}] Hardware error - Input voltage error! "
+                f"Check power supply voltage and current capacity. "
+                f"Ensure the servo is receiving adequate power (typically 6-8.4V for most servos)."
+            )
+        raise RuntimeError(f"[ID:{servo_id:03d}] Servo error: {error_msg}")
 
     def configure_servos(self, acc=0, speed=0):
         """
@@ -226,17 +312,43 @@ class MotorController:
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        # Configure all servos
-        for servo_id in self.servo_ids:
-            self.set_acceleration(servo_id, acc)
-            self.set_speed(servo_id, speed)
+        # Configure all servos with one sync write per register instead of a
+        # round trip per servo (sync writes are not answered, so servo errors are not reported)
+        self._sync_write(ADDR_STS_GOAL_ACC, 1, [[acc]] * self.num_servos)
+        self._sync_write(
+            ADDR_STS_GOAL_SPEED, 2, [[SCS_LOBYTE(speed), SCS_HIBYTE(speed)]] * self.num_servos
+        )
+
+    def _sync_write(self, address, data_length, params):
+        """
+        Write the same register of all servos with a single sync write packet.
+
+        Args:
+            address (int): Start address of the register
+            data_length (int): Number of bytes written per servo
+            params (list): Byte list for each servo (must match length of servo_ids)
+        """
+        group_sync_write = GroupSyncWrite(
+            self.portHandler, self.packetHandler, address, data_length
+        )
+        for servo_id, param in zip(self.servo_ids, params):
+            if not group_sync_write.addParam(servo_id, param):
+                raise RuntimeError(
+                    f"[ID:{servo_id:03d}] groupSyncWrite addparam failed"
+                )
+
+        scs_comm_result = group_sync_write.txPacket()
+        if scs_comm_result != COMM_SUCCESS:
+            raise RuntimeError(
+                f"Sync write failed: {self.packetHandler.getTxRxResult(scs_comm_result)}"
+            )
 
     def set_goal_positions(self, positions):
         """
-        Set goal positions for all servos simultaneously.
+        Set goal positions for all servos simultaneously with a single sync write packet.
 
         Args:
-            positions (list): List of goal positions for each servo (must match length of servo_ids)
+            positions (list or numpy.ndarray): List of goal positions for each servo (must match length of servo_ids)
         """
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
@@ -246,16 +358,16 @@ class MotorController:
                 f"Number of positions ({len(positions)}) must match number of servos ({self.num_servos})"
             )
 
-        # Clear previous parameters
-        self.groupSyncWrite.clearParam()
-
-        # Add positions for all servos
-        for servo_id, position in zip(self.servo_ids, positions):
-            param_goal_position = [SCS_LOBYTE(position), SCS_HIBYTE(position)]
-            if not self.groupSyncWrite.addParam(servo_id, param_goal_position):
-                raise RuntimeError(
-                    f"[ID:{servo_id:03d}] groupSyncWrite addparam failed"
-                )
+        # Pack positions for all servos into their parameter buffers (plain ints at the SDK boundary)
+        if hasattr(positions, "tolist"):
+            positions = positions.tolist()
+        pack_into = self.goal_position_format.pack_into
+        change_param = self.groupSyncWrite.changeParam
+        for servo_id, param, position in zip(
+            self.servo_ids, self.goal_position_params, positions
+        ):
+            pack_into(param, 0, position & 0xFFFF)
+            change_param(servo_id, param)
 
         # Send sync write packet
         scs_comm_result = self.groupSyncWrite.txPacket()
@@ -264,95 +376,208 @@ class MotorController:
                 f"Sync write failed: {self.packetHandler.getTxRxResult(scs_comm_result)}"
             )
 
-        # Clear parameters after sending
-        self.groupSyncWrite.clearParam()
-
     def read_positions(self):
         """
-        Read present positions and speeds from all servos.
+        Read present positions and speeds from all servos with a single sync read transaction.
 
         Returns:
-            dict: Dictionary with keys 'servo1', 'servo2', etc., each containing:
-                - 'position' (int): Present position
-                - 'speed' (int): Present speed
+            dict: Dictionary with keys 'servo1', 'servo2', etc., each a ServoState with:
+                - position (int): Present position
+                - speed (int): Present speed
             Also returns a 'positions' list for convenience: [pos1, pos2, ...]
+            The same dictionary and list are updated in place on every call; copy them
+            to keep a reading.
+        """
+        result = self.positions_result
+        positions_list = self.positions_list
+        servo_keys = self.servo_keys
+        servo_state = ServoState
+
+        # Read data for all servos
+        for idx, (position, speed) in enumerate(self._sync_read()):
+            result[servo_keys[idx]] = servo_state(position, speed)
+            positions_list[idx] = position
+
+        return result
+
+    def read_positions_tuple(self):
+        """
+        Read present positions from all servos with a single sync read transaction.
+
+        Unlike read_positions(), no per-servo dictionaries are built.
+
+        Returns:
+            tuple: Present positions (int) in the order of servo_ids
+        """
+        return tuple(position for position, _ in self._sync_read())
+
+    def read_positions_np(self, out_pos=None, out_spd=None):
+        """
+        Read present positions and speeds from all servos into NumPy arrays with a single sync read transaction.
+
+        Args:
+            out_pos (numpy.ndarray, optional): int16 array to fill with the positions
+            out_spd (numpy.ndarray, optional): int16 array to fill with the speeds
+
+        Returns:
+            tuple: (positions, speeds) int16 arrays in the order of servo_ids
+        """
+        self._send_read_request()
+
+        # Allocate while the replies are on the wire
+        if out_pos is None:
+            out_pos = np.empty(self.num_servos, dtype=np.int16)
+        if out_spd is None:
+            out_spd = np.empty(self.num_servos, dtype=np.int16)
+
+        states = self._receive_read_reply()
+        for idx, (position, speed) in enumerate(states):
+            out_pos[idx] = position
+            out_spd[idx] = speed
+        return out_pos, out_spd
+
+    def _sync_read(self):
+        """
+        Send the sync read request for all servos and decode the replies.
+
+        Returns:
+            list: (position, speed) tuple for each servo in the order of servo_ids
+        """
+        self._send_read_request()
+        return self._receive_read_reply()
+
+    def _send_read_request(self):
+        """
+        Send the sync read request for all servos without waiting for the replies.
+
+        Must be followed by _receive_read_reply() before the next packet is sent.
         """
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        # Send sync read request
-        scs_comm_result = self.groupSyncRead.txRxPacket()
+        scs_comm_result = self.groupSyncRead.txPacket()
         if scs_comm_result != COMM_SUCCESS:
             raise RuntimeError(
                 f"Sync read failed: {self.packetHandler.getTxRxResult(scs_comm_result)}"
             )
 
-        result = {}
-        positions_list = []
+    def _receive_read_reply(self):
+        """
+        Receive and decode the replies to the last sync read request.
 
-        # Read data for all servos
-        for idx, servo_id in enumerate(self.servo_ids):
-            if self.groupSyncRead.isAvailable(servo_id, ADDR_STS_PRESENT_POSITION, 4):
-                scs_data = self.groupSyncRead.getData(
-                    servo_id, ADDR_STS_PRESENT_POSITION, 4
-                )
-                position = SCS_LOWORD(scs_data)
-                speed = SCS_TOHOST(SCS_HIWORD(scs_data), 15)
-                result[f"servo{idx+1}"] = {"position": position, "speed": speed}
-                positions_list.append(position)
-            else:
+        The reply bytes are unpacked straight from the GroupSyncRead data, one struct call
+        per servo, instead of going through isAvailable/getData and the SCS_* word helpers.
+
+        Returns:
+            list: (position, speed) tuple for each servo in the order of servo_ids
+        """
+        scs_comm_result = self.groupSyncRead.rxPacket()
+        if scs_comm_result != COMM_SUCCESS:
+            raise RuntimeError(
+                f"Sync read failed: {self.packetHandler.getTxRxResult(scs_comm_result)}"
+            )
+
+        data_dict = self.groupSyncRead.data_dict
+        unpack = self.present_format.unpack
+        states = []
+        append = states.append
+        for servo_id in self.servo_ids:
+            data = data_dict.get(servo_id)
+            if data is None or len(data) < 4:
                 raise RuntimeError(
                     f"[ID:{servo_id:03d}] groupSyncRead getdata failed"
                 )
-
-        result["positions"] = positions_list
-        return result
+            position, speed = unpack(bytes(data[:4]))
+            # Speed is sign-magnitude with the sign in bit 15
+            if speed & 0x8000:
+                speed = -(speed & 0x7FFF)
+            append((position, speed))
+        return states
 
     def wait_for_positions(
         self,
         goal_positions,
         threshold=20,
         timeout=None,
+        initial_interval=0.001,
+        max_interval=0.01,
     ):
         """
-        Wait until all servos reach their goal positions.
+        Wait until all servos reach their goal positions, polling them with read_positions_np().
+
+        The delay between polls adapts to the motion: the speed of the slowest servo is
+        estimated from consecutive polls and the next poll is timed for when it should
+        arrive, clamped to [initial_interval, max_interval]. Until a speed is known the
+        delay grows geometrically from initial_interval.
 
         Args:
             goal_positions (list): List of goal positions for each servo (must match length of servo_ids)
             threshold (int): Position threshold to consider reached (default: 20)
             timeout (float): Maximum time to wait in seconds (None for no timeout)
+            initial_interval (float): Shortest delay between polls in seconds (default: 0.001)
+            max_interval (float): Longest delay between polls in seconds (default: 0.01)
 
         Returns:
             bool: True if positions reached, False if timeout
         """
-        import time
-
         if len(goal_positions) != self.num_servos:
             raise ValueError(
                 f"Number of goal positions ({len(goal_positions)}) must match number of servos ({self.num_servos})"
             )
 
-        start_time = time.time()
+        monotonic_ns = time.monotonic_ns
+        sleep = time.sleep
+        deadline_ns = monotonic_ns() + int(timeout * 1e9) if timeout is not None else None
+        interval = initial_interval
+        last_diff = None
+        last_time_ns = None
+
+        goal_positions = np.asarray(goal_positions, dtype=np.int32)
+        positions = np.empty(self.num_servos, dtype=np.int16)
+        speeds = np.empty(self.num_servos, dtype=np.int16)
 
         while True:
-            positions = self.read_positions()
-
-            # Check if all servos are within threshold
-            all_reached = True
-            for idx, goal_pos in enumerate(goal_positions):
-                current_pos = positions[f"servo{idx+1}"]["position"]
-                pos_diff = abs(goal_pos - current_pos)
-                if pos_diff > threshold:
-                    all_reached = False
-                    break
-
-            if all_reached:
+            self.read_positions_np(positions, speeds)
+            now_ns = monotonic_ns()
+
+            # Largest distance of any servo from its goal
+            max_diff = int(np.abs(goal_positions - positions).max())
+            if max_diff <= threshold:
                 return True
 
-            if timeout is not None and (time.time() - start_time) > timeout:
+            if deadline_ns is not None and now_ns > deadline_ns:
                 return False
 
-            time.sleep(0.01)  # Small delay to avoid excessive CPU usage
+            # Time the next poll for when the slowest servo should be within threshold
+            if last_diff is not None and last_diff > max_diff:
+                speed = (last_diff - max_diff) * 1e9 / (now_ns - last_time_ns)
+                interval = (max_diff - threshold) / speed
+            else:
+                interval *= 1.5
+            interval = min(max(interval, initial_interval), max_interval)
+            last_diff, last_time_ns = max_diff, now_ns
+
+            sleep(interval)  # Delay to avoid excessive CPU and bus usage
+
+    def move_and_wait(self, positions, threshold=20, timeout=None):
+        """
+        Set goal positions for all servos and wait until they reach them.
+
+        One sync write packet is sent, then the servos are polled with one sync read per
+        poll as in wait_for_positions().
+
+        Args:
+            positions (list or numpy.ndarray): List of goal positions for each servo (must match length of servo_ids)
+            threshold (int): Position threshold to consider reached (default: 20)
+            timeout (float): Maximum time to wait in seconds (None for no timeout)
+
+        Returns:
+            bool: True if positions reached, False if timeout
+        """
+        if hasattr(positions, "tolist"):
+            positions = positions.tolist()
+        self.set_goal_positions(positions)
+        return self.wait_for_positions(positions, threshold, timeout)
 
     def __enter__(self):
         """Context manager entry."""
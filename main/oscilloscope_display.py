@@ -1,4 +1,8 @@
+import queue
+import threading
+import time
 import tkinter as tk
+from matplotlib.animation import FuncAnimation
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 
@@ -6,41 +10,110 @@ import pyvisa as visa
 import numpy as np
 
 MAX_DURATION = 100
+# Y margin left by autoscaling, as a fraction of the data span. Twice matplotlib's default,
+# so the signal can drift by ~5% of its span before the limits (and background) are rebuilt.
+Y_MARGIN = 0.1
+# Shortest period between redraws in milliseconds (~30 Hz)
+REFRESH_PERIOD = 33
 
 
 class StreamingPlot:
     def __init__(self, root):
         self.root = root
-        self.data = np.array([[], []])  # [[x1, x2, ...], [y1, y2, ...]]
+        self.data = (np.empty(0), np.empty(0))  # ([x1, x2, ...], [y1, y2, ...])
 
         fig = Figure()
         self.ax = fig.add_subplot(111)
         (self.line,) = self.ax.plot([], [])
+        self.ax.set_ymargin(Y_MARGIN)
 
         self.canvas = FigureCanvasTkAgg(fig, master=root)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-        self.update_plot()
-
-    def update_plot(self):
-        # Simulated streaming data
-        self.data = values()
-
-        if len(self.data[0]) / sample_rate > MAX_DURATION:
-            cutoff = round(MAX_DURATION * sample_rate)
-            self.data = self.data[:, -cutoff:]
+        self.plot_width = max(int(self.ax.bbox.width), 1)  # axes width in pixels, for decimation
+        self.rescaled_extent = (0, 0)  # x_max and y span of the data at the last rescale
+
+        # VISA reads run on their own thread so a slow transfer never blocks the Tk loop.
+        # The queue holds only the newest frame; stale ones are dropped.
+        self.frames = queue.Queue(maxsize=1)
+        # X values, grown to the longest frame seen and sliced to the length of each frame.
+        # float64 like the y data from decimate(), which is what Line2D converts to.
+        self.x = np.empty(0)
+        self.acquire_time = 0.0  # Moving average of the time per VISA read in milliseconds
+        threading.Thread(target=self.acquire, daemon=True).start()
+
+        # The animation blits only the line; it caches the axes background and re-captures it
+        # on resize and whenever the view changes. Kept on self so it is not garbage collected.
+        self.animation = FuncAnimation(
+            fig,
+            self.update_plot,
+            init_func=self.init_plot,
+            interval=REFRESH_PERIOD,
+            blit=True,
+            cache_frame_data=False,
+        )
+
+    def acquire(self):
+        # All VISA calls on the device happen on this thread
+        while True:
+            start = time.perf_counter()
+            y = values()
+            elapsed = (time.perf_counter() - start) * 1000
+            self.acquire_time = 0.9 * self.acquire_time + 0.1 * elapsed
+
+            if len(y) / sample_rate > MAX_DURATION:
+                cutoff = round(MAX_DURATION * sample_rate)
+                y = y[-cutoff:]  # view, no copy
+            if self.x.size < len(y):
+                self.x = np.arange(len(y), dtype=np.float64)
+            x, y = decimate(self.x[: len(y)], y, self.plot_width)
+
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put((x, y))
+
+    def needs_rescale(self):
+        if len(self.data[0]) == 0:
+            return False
+        x_max = self.data[0][-1]
+        y_min, y_max = self.data[1].min(), self.data[1].max()
+        x_lo, x_hi = self.ax.get_xlim()
+        y_lo, y_hi = self.ax.get_ylim()
+        if x_max > x_hi or y_min < y_lo or y_max > y_hi:
+            return True
+        # Also rescale once the data spans under half of what it spanned at the last rescale
+        last_x_max, last_y_span = self.rescaled_extent
+        return x_max < 0.5 * last_x_max or (y_max - y_min) < 0.5 * last_y_span
+
+    def init_plot(self):
+        return (self.line,)
+
+    def update_plot(self, frame):
+        # Redraw no faster than the scope delivers frames, and at most at ~30 Hz
+        self.animation.event_source.interval = max(REFRESH_PERIOD, round(self.acquire_time))
+        self.plot_width = max(int(self.ax.bbox.width), 1)
+
+        try:
+            self.data = self.frames.get_nowait()
+        except queue.Empty:
+            # No new frame from the acquisition thread yet
+            return (self.line,)
 
         self.line.set_data(*self.data)
-        self.ax.relim()
-        self.ax.autoscale_view()
 
-        self.canvas.draw()
-        self.root.after(10, self.update_plot)  # first argument is update period
+        if self.needs_rescale():
+            # Limits changed: a full draw renders the new ticks without the animated line,
+            # and the animation then caches that as the background of the new view
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.rescaled_extent = (self.data[0][-1], self.data[1].max() - self.data[1].min())
+            self.canvas.draw()
+        return (self.line,)
 
 
 rm = visa.ResourceManager()
 devices = rm.list_resources()
-print(devices)
 # assert len(devices) == 1
 device = rm.open_resource(devices[0])
 
@@ -99,10 +172,30 @@ device.write("SYST:BEEP ON")
 device.write("SYST:BEEP OFF")
 
 
+def decimate(x, y, buckets):
+    # Min/max decimation: keep the extremes of each of `buckets` equal slices of the
+    # newest samples, so visible peaks survive while the line has ~2 points per pixel.
+    # y is returned as a contiguous float64 array either way.
+    n = len(y)
+    if n <= 2 * buckets:
+        return x, y.astype(np.float64)
+
+    size = n // buckets
+    start = n - size * buckets
+    slices = y[start:].reshape(buckets, size)
+
+    y_out = np.empty(2 * buckets)
+    np.min(slices, axis=1, out=y_out[0::2])
+    np.max(slices, axis=1, out=y_out[1::2])
+    x_out = np.repeat(x[start::size], 2)
+    return x_out, y_out
+
+
 def values():
-    y = device.query_binary_values("WAV:DATA?", container=np.array, datatype="i")
-    x = np.arange(0, len(y))
-    return np.array([x, y])
+    # WAV:FORM WORD sends one little-endian 16-bit word per point
+    return device.query_binary_values(
+        "WAV:DATA?", container=np.array, datatype="h", is_big_endian=False
+    )
 
 
 root = tk.Tk()
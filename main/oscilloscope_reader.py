@@ -2,9 +2,17 @@
 # OscilloscopeReader class for reading data from oscilloscopes via VISA
 #
 
+import logging
+import time
+
 import pyvisa as visa
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+# Waveform data query, the same for every read
+WAVEFORM_DATA_QUERY = "WAV:DATA?"
+
 
 class OscilloscopeReader:
     """
@@ -24,7 +32,13 @@ class OscilloscopeReader:
         self.rm = None
         self.device = None
         self.sample_rate = None
+        self.memory_depth = None  # Points per record, set by configure()
         self.is_connected = False
+        self.source_channel = None  # Last channel selected with WAV:SOUR
+        # Sample indices and times, built once and sliced for every read
+        self.sample_indices = np.empty(0, dtype=np.int64)
+        self.sample_times = np.empty(0)
+        self.sample_times_rate = None  # Sample rate the cached times were built with
 
     def connect(self):
         """
@@ -39,15 +53,15 @@ class OscilloscopeReader:
 
             # Get available devices
             devices = self.rm.list_resources()
-            print(f"Available devices: {devices}")
+            logger.debug("Available devices: %s", devices)
 
             # Select device
             if self.device_name is None:
                 if len(devices) == 0:
                     raise RuntimeError("No VISA devices found")
                 if len(devices) > 1:
-                    print(
-                        f"Warning: Multiple devices found. Using first device: {devices[0]}"
+                    logger.warning(
+                        "Multiple devices found. Using first device: %s", devices[0]
                     )
                 self.device_name = devices[0]
             elif self.device_name not in devices:
@@ -61,16 +75,17 @@ class OscilloscopeReader:
 
             # Get device identification
             idn = self.device.query("*IDN?")
-            print(f"Device Identification Number: {idn}")
+            logger.debug("Device Identification Number: %s", idn)
 
             # Clear event register
             self.device.write("*CLS")
+            self.source_channel = None
 
             self.is_connected = True
             return True
 
         except Exception as e:
-            print(f"Error connecting to oscilloscope: {e}")
+            logger.error("Error connecting to oscilloscope: %s", e)
             if self.device:
                 try:
                     self.device.close()
@@ -88,9 +103,9 @@ class OscilloscopeReader:
             try:
                 self.device.close()
                 self.is_connected = False
-                print("Disconnected from oscilloscope")
+                logger.debug("Disconnected from oscilloscope")
             except Exception as e:
-                print(f"Error disconnecting: {e}")
+                logger.error("Error disconnecting: %s", e)
 
     def configure(
         self,
@@ -114,18 +129,21 @@ class OscilloscopeReader:
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        if start_acquisition:
-            self.device.write("RUN")  # Start reading
-
-        self.device.write(f"ACQ:MDEP {memory_depth}")  # Memory depth
-        self.device.write(f"WAV:MODE {waveform_mode}")  # Waveform mode
-        self.device.write(f"WAV:FORM {waveform_format}")  # Data format
-        self.device.write(f"TIM:MODE {time_mode}")  # Time mode
-        self.device.write(f"TIM:MAIN:SCAL {time_scale}")  # Time scale
+        commands = ["RUN"] if start_acquisition else []  # Start reading
+        commands += [
+            f"ACQ:MDEP {memory_depth}",  # Memory depth
+            f"WAV:MODE {waveform_mode}",  # Waveform mode
+            f"WAV:FORM {waveform_format}",  # Data format
+            f"TIM:MODE {time_mode}",  # Time mode
+            f"TIM:MAIN:SCAL {time_scale}",  # Time scale
+        ]
+        # Send all settings as one compound SCPI message (each rooted with ':')
+        self.device.write(";".join(f":{command}" for command in commands))
+        self.memory_depth = memory_depth
 
         # Get and store sample rate
         self.sample_rate = float(self.device.query("ACQ:SRAT?"))
-        print(f"Sample Rate: {self.sample_rate}")
+        logger.debug("Sample Rate: %s", self.sample_rate)
 
     def get_sample_rate(self):
         """
@@ -158,6 +176,33 @@ class OscilloscopeReader:
 
         self.device.write("STOP")
 
+    def wait_new_record(self, timeout=0.1):
+        """
+        Wait until the acquisition memory holds only samples taken after this call.
+
+        While running, the oscilloscope keeps overwriting its record, so a full record
+        length (memory_depth / sample_rate) after a change the record no longer contains
+        older samples. The oscilloscope has no status query for this in RUN/ROLL mode,
+        so the record length is slept, capped by timeout.
+
+        Args:
+            timeout (float): Maximum time to wait in seconds (default: 0.1)
+
+        Returns:
+            bool: True if a full record length was waited, False if capped by timeout
+        """
+        if not self.is_connected:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        if self.memory_depth is None or not self.sample_rate:
+            # Record length unknown, wait for the whole timeout
+            time.sleep(timeout)
+            return False
+
+        record_time = self.memory_depth / self.sample_rate
+        time.sleep(min(record_time, timeout))
+        return record_time <= timeout
+
     def beep(self):
         """
         Make the oscilloscope beep (useful for testing connection).
@@ -165,8 +210,7 @@ class OscilloscopeReader:
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        self.device.write("SYST:BEEP ON")
-        self.device.write("SYST:BEEP OFF")
+        self.device.write(":SYST:BEEP ON;:SYST:BEEP OFF")
 
     def read_values(self, channel=None):
         """
@@ -176,27 +220,70 @@ class OscilloscopeReader:
             channel (int, optional): Channel number to read from. If None, reads default channel.
 
         Returns:
-            numpy.ndarray: Array of shape (2, N) where:
-                - First row (index 0): X values (time/sample indices)
-                - Second row (index 1): Y values (voltage/amplitude)
+            tuple: (x, y) 1-D arrays of length N where:
+                - x: X values (sample indices, read-only)
+                - y: Y values (voltage/amplitude)
+        """
+        y = self.read_y_values(channel)
+
+        # X values (sample indices), sliced from the cached index array
+        x = self._sample_indices(len(y))
+
+        # Return the two rows as they are, without stacking them into one array
+        return x, y
+
+    def read_y_values(self, channel=None):
+        """
+        Read only the most recent waveform Y values from the oscilloscope.
+
+        Args:
+            channel (int, optional): Channel number to read from. If None, reads default channel.
+
+        Returns:
+            numpy.ndarray: 1-D array of Y values (voltage/amplitude)
         """
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
-        # Select channel if specified
-        if channel is not None:
-            self.device.write(f"WAV:SOUR CHAN{channel}")
+        if channel is not None and channel != self.source_channel:
+            # Select the source and request its data in one message
+            self.device.write(f":WAV:SOUR CHAN{channel};:{WAVEFORM_DATA_QUERY}")
+            self.source_channel = channel
+            return self.device.read_binary_values(container=np.array, datatype="i")
 
-        # Query waveform data
-        y = self.device.query_binary_values(
-            "WAV:DATA?", container=np.array, datatype="i"
+        # Query waveform data (the numpy container is filled straight from the binary block)
+        return self.device.query_binary_values(
+            WAVEFORM_DATA_QUERY, container=np.array, datatype="i"
         )
 
-        # Generate x values (sample indices)
-        x = np.arange(0, len(y))
+    def read_all_channels(self, channels):
+        """
+        Read the most recent waveform Y values of several channels.
+
+        The scope has a single VISA session, so the channels are read one after another,
+        each with one message that selects the source and requests its data.
+
+        Args:
+            channels (list): Channel numbers to read from
+
+        Returns:
+            list: 1-D array of Y values for each channel, in the order of channels
+        """
+        return [self.read_y_values(channel) for channel in channels]
+
+    def read_mean(self, channel=None):
+        """
+        Read the mean of the most recent waveform Y values, without building the X values.
 
-        # Return as 2D array: [x, y]
-        return np.array([x, y])
+        Args:
+            channel (int, optional): Channel number to read from. If None, reads default channel.
+
+        Returns:
+            float: Mean of the Y values
+        """
+        y = self.read_y_values(channel)
+        # Reduce directly with a float64 accumulator, skipping np.mean's argument handling
+        return float(np.add.reduce(y, dtype=np.float64)) / y.size
 
     def read_values_with_time(self, channel=None):
         """
@@ -206,9 +293,9 @@ class OscilloscopeReader:
             channel (int, optional): Channel number to read from. If None, reads default channel.
 
         Returns:
-            numpy.ndarray: Array of shape (2, N) where:
-                - First row (index 0): Time values in seconds
-                - Second row (index 1): Y values (voltage/amplitude)
+            tuple: (t, y) 1-D arrays of length N where:
+                - t: Time values in seconds (read-only)
+                - y: Y values (voltage/amplitude)
         """
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
@@ -218,12 +305,45 @@ class OscilloscopeReader:
             self.sample_rate = self.get_sample_rate()
 
         # Read values
-        x, y = self.read_values(channel)
+        y = self.read_y_values(channel)
+
+        # Sample times, sliced from the cached time array
+        time_values = self._sample_times(len(y))
 
-        # Convert sample indices to time
-        time_values = x / self.sample_rate
+        return time_values, y
 
-        return np.array([time_values, y])
+    def _sample_indices(self, n):
+        """
+        Return the sample indices 0..n-1 as a read-only view of a cached array.
+
+        Args:
+            n (int): Number of samples
+
+        Returns:
+            numpy.ndarray: Sample indices
+        """
+        if self.sample_indices.size < n:
+            self.sample_indices = np.arange(n)
+            self.sample_indices.flags.writeable = False
+        return self.sample_indices[:n]
+
+    def _sample_times(self, n):
+        """
+        Return the times of samples 0..n-1 as a read-only view of a cached array.
+
+        The cache is rebuilt when it is too short or the sample rate has changed.
+
+        Args:
+            n (int): Number of samples
+
+        Returns:
+            numpy.ndarray: Sample times in seconds
+        """
+        if self.sample_times.size < n or self.sample_times_rate != self.sample_rate:
+            self.sample_times = self._sample_indices(n) / self.sample_rate
+            self.sample_times.flags.writeable = False
+            self.sample_times_rate = self.sample_rate
+        return self.sample_times[:n]
 
     def query(self, command):
         """
@@ -250,6 +370,8 @@ class OscilloscopeReader:
         if not self.is_connected:
             raise RuntimeError("Not connected. Call connect() first.")
 
+        # The command may change the waveform source
+        self.source_channel = None
         self.device.write(command)
 
     def __enter__(self):